@@ -4,18 +4,30 @@
 
 import bpy
 import mathutils
+import numpy as np
+import bmesh
 import json
-import threading
+import codecs
+import collections
+import concurrent.futures
 import socket
+import selectors
+import struct
 import time
+import hashlib
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import tempfile
+import shutil
 import traceback
 import os
-import shutil
 from bpy.props import StringProperty, IntProperty, BoolProperty, EnumProperty
 import io
-from contextlib import redirect_stdout
+import functools
+import inspect
+import itertools
+from contextlib import redirect_stdout, nullcontext
 
 bl_info = {
     "name": "Blender MCP Enhanced",
@@ -29,146 +41,329 @@ bl_info = {
 
 RODIN_FREE_TRIAL_KEY = "k9TcfFoEhNd9cCPP2guHAHHHkctZHIRhZDywZ1euGUXwihbYLpOjQhofby80NJez"
 
-class BlenderMCPServer:
-    def __init__(self, host='localhost', port=9876):
-        self.host = host
-        self.port = port
-        self.running = False
-        self.socket = None
-        self.server_thread = None
+# Scene properties the integration status messages are built from
+STATUS_PROPERTIES = (
+    "blendermcp_use_polyhaven",
+    "blendermcp_use_hyper3d",
+    "blendermcp_hyper3d_mode",
+    "blendermcp_hyper3d_api_key",
+)
+
+# Every Hyper3D request is bounded so a stalled connection can't hang a command
+HYPER3D_TIMEOUT = (5, 30)  # (connect, read) seconds
+HYPER3D_DOWNLOAD_TIMEOUT = (5, 60)
+
+def _hyper3d_json(response):
+    """Parse a Hyper3D API response, raising with the status and body on HTTP errors"""
+    if not response.ok:
+        # Keep the body, it carries the API's explanation (e.g. insufficient balance)
+        raise requests.HTTPError(f"{response.status_code} {response.reason}: {response.text[:500]}", response=response)
+    return _loads(response.content)
+
+# Multipart fields sent with every main site Rodin job
+_RODIN_TIER_FIELD = ("tier", (None, "Sketch"))
+_RODIN_MESH_MODE_FIELD = ("mesh_mode", (None, "Raw"))
+
+# wait_for_rodin_job backoff: 0.5s doubling up to 15s, never waiting longer than 5 minutes
+RODIN_POLL_INITIAL_DELAY = 0.5
+RODIN_POLL_MAX_DELAY = 15.0
+RODIN_WAIT_TIMEOUT = 300.0
+
+# Wire protocol: clients either send bare JSON objects, or frames made of a
+# 4-byte big-endian payload length followed by the JSON payload. The mode is
+# picked from the first byte a client sends and responses use the same mode.
+FRAME_HEADER = struct.Struct('!I')
+MAX_FRAME_SIZE = 1 << 27  # keeps the first header byte below any JSON start byte
+JSON_STREAM_START = frozenset(b'{ \t\r\n')
+
+# Sockets are serviced from main-thread timers
+POLL_INTERVAL = 0.01
+SEND_TIMEOUT = 15.0
+# Slow network work runs on a worker pool, its results are picked up by a timer at this interval
+IO_WORKERS = 4
+IO_CHECK_INTERVAL = 0.1
+SOCKET_BUFFER_SIZE = 1 << 20
+
+# Prefer orjson for responses: it encodes straight to bytes with a C encoder,
+# and parses HTTP response bodies without decoding them to str first
+try:
+    import orjson
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+    _loads = json.loads
+
+@functools.lru_cache(maxsize=128)
+def _compile_code(code):
+    """Compile an execute_code snippet, reusing the code object for repeated snippets"""
+    return compile(code, '<mcp>', 'exec')
+
+# Polyhaven API and file downloads share pooled keep-alive connections
+POLYHAVEN_TIMEOUT = (5, 60)  # (connect, read) seconds
+POLYHAVEN_DOWNLOAD_TIMEOUT = (5, 120)
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+def _make_http_session(status_forcelist, pool_connections, pool_maxsize):
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=status_forcelist)
+    session.mount("https://", HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry))
+    session.headers["User-Agent"] = "blender-mcp"
+    # Accept-Encoding is left to requests: it already offers gzip and deflate (plus br/zstd
+    # when those decoders are installed) and decompresses transparently in .json()
+    return session
+
+_PH_SESSION = _make_http_session([429, 500, 502, 503, 504], pool_connections=8, pool_maxsize=16)
+
+# Hyper3D job creation, polling and downloads reuse the TLS connections to
+# hyperhuman.deemos.com / queue.fal.run instead of handshaking on every call
+_HTTP = _make_http_session([502, 503, 504], pool_connections=4, pool_maxsize=8)
+
+# The categories, asset lists and file listings change rarely, keep them for a while
+POLYHAVEN_CACHE_TTL = 900
+POLYHAVEN_CACHE_SIZE = 256
+_ph_cache = {}
+
+def _ph_get_json(url, params=None):
+    """GET a Polyhaven API endpoint, returns (status_code, data) and caches successful responses"""
+    key = (url, tuple(sorted(params.items())) if params else None)
+    now = time.monotonic()
+    cached = _ph_cache.get(key)
+    if cached is not None and now - cached[0] < POLYHAVEN_CACHE_TTL:
+        return 200, cached[1]
     
-    def start(self):
-        if self.running:
-            print("Server is already running")
-            return
-            
-        self.running = True
-        
+    response = _PH_SESSION.get(url, params=params, timeout=POLYHAVEN_TIMEOUT)
+    if response.status_code != 200:
+        return response.status_code, None
+    data = response.json()
+    
+    _ph_cache.pop(key, None)
+    if len(_ph_cache) >= POLYHAVEN_CACHE_SIZE:
+        # Entries are kept in insertion order, drop the oldest
+        del _ph_cache[next(iter(_ph_cache))]
+    _ph_cache[key] = (now, data)
+    return 200, data
+
+# Downloaded Polyhaven files are kept per user and reused when the same asset is imported again
+_PH_CACHE_DIR = os.path.join(bpy.utils.user_resource('DATAFILES'), "polyhaven_cache")
+
+# What each texture map type feeds in a Principled BSDF material
+_MAP_ROLE = {
+    'color': 'base', 'diffuse': 'base', 'albedo': 'base',
+    'roughness': 'rough', 'rough': 'rough',
+    'metallic': 'metal', 'metalness': 'metal', 'metal': 'metal',
+    'nor_gl': 'normal', 'gl': 'normal', 'normal': 'normal', 'nor': 'normal',
+    # DirectX normals are only used when there is no OpenGL one
+    'nor_dx': 'normal_dx', 'dx': 'normal_dx',
+    'displacement': 'disp', 'disp': 'disp', 'height': 'disp',
+    'ao': 'ao',
+    'arm': 'arm',
+}
+
+# Texture maps holding colour data, every other map is read as raw values
+_COLOR_MAPS = frozenset(map_type for map_type, role in _MAP_ROLE.items() if role == 'base')
+
+def _set_colorspace(image, is_color):
+    """Set the first colorspace this Blender build knows of for a colour or a data map"""
+    for colorspace in (('sRGB',) if is_color else ('Non-Color', 'Linear')):
         try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.socket.bind((self.host, self.port))
-            self.socket.listen(1)
-            
-            self.server_thread = threading.Thread(target=self._server_loop)
-            self.server_thread.daemon = True
-            self.server_thread.start()
-            
-            print(f"Enhanced BlenderMCP server started on {self.host}:{self.port}")
-        except Exception as e:
-            print(f"Failed to start server: {str(e)}")
-            self.stop()
-            
-    def stop(self):
-        self.running = False
-        if self.socket:
-            try:
-                self.socket.close()
-            except:
-                pass
-            self.socket = None
-        if self.server_thread:
-            try:
-                if self.server_thread.is_alive():
-                    self.server_thread.join(timeout=1.0)
-            except:
-                pass
-            self.server_thread = None
-        print("Enhanced BlenderMCP server stopped")
+            image.colorspace_settings.name = colorspace
+            return
+        except TypeError:
+            continue
+
+# Principled BSDF inputs keep their order within a Blender build, so the
+# index of each named input only has to be looked up once per session
+_PRINCIPLED_INPUT_INDEX = {}
+
+def _principled_input(principled, name):
+    """Return a Principled BSDF input socket by integer index instead of a name scan"""
+    index = _PRINCIPLED_INPUT_INDEX.get(name)
+    if index is None:
+        index = principled.inputs.find(name)
+        if index < 0:
+            raise KeyError(f"Principled BSDF has no input '{name}'")
+        _PRINCIPLED_INPUT_INDEX[name] = index
+    return principled.inputs[index]
+
+def _material_uses_images(mat, images):
+    """Whether the image texture nodes of mat reference exactly the given images"""
+    if not mat.use_nodes or not mat.node_tree:
+        return False
+    used = {node.image.name for node in mat.node_tree.nodes if node.type == 'TEX_IMAGE' and node.image}
+    return used == {image.name for image in images}
+
+def _build_principled_material(name, images_by_maptype):
+    """Create a material that feeds texture maps, keyed by map type, into a Principled BSDF"""
+    mat = bpy.data.materials.new(name=name)
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+    links = mat.node_tree.links
+    nodes.clear()
     
-    def _server_loop(self):
-        """Main server loop in a separate thread"""
-        print("Server thread started")
-        self.socket.settimeout(1.0)
-        
-        while self.running:
-            try:
-                try:
-                    client, address = self.socket.accept()
-                    print(f"Connected to client: {address}")
-                    client_thread = threading.Thread(target=self._handle_client, args=(client,))
-                    client_thread.daemon = True
-                    client_thread.start()
-                except socket.timeout:
-                    continue
-                except Exception as e:
-                    print(f"Error accepting connection: {str(e)}")
-                    time.sleep(0.5)
-            except Exception as e:
-                print(f"Error in server loop: {str(e)}")
-                if not self.running:
-                    break
-                time.sleep(0.5)
-        print("Server thread stopped")
+    # Create every node first and link them once the whole tree exists
+    output = nodes.new(type='ShaderNodeOutputMaterial')
+    output.location = (600, 0)
+    principled = nodes.new(type='ShaderNodeBsdfPrincipled')
+    principled.location = (300, 0)
+    tex_coord = nodes.new(type='ShaderNodeTexCoord')
+    tex_coord.location = (-800, 0)
+    mapping = nodes.new(type='ShaderNodeMapping')
+    mapping.location = (-600, 0)
+    mapping.vector_type = 'TEXTURE'
     
-    def _handle_client(self, client):
-        """Handle connected client"""
-        print("Client handler started")
-        client.settimeout(None)
-        buffer = b''
-        
-        try:
-            while self.running:
-                try:
-                    data = client.recv(8192)
-                    if not data:
-                        print("Client disconnected")
-                        break
-                    
-                    buffer += data
-                    try:
-                        command = json.loads(buffer.decode('utf-8'))
-                        buffer = b''
-                        
-                        def execute_wrapper():
-                            try:
-                                response = self.execute_command(command)
-                                response_json = json.dumps(response)
-                                try:
-                                    client.sendall(response_json.encode('utf-8'))
-                                except:
-                                    print("Failed to send response - client disconnected")
-                            except Exception as e:
-                                print(f"Error executing command: {str(e)}")
-                                traceback.print_exc()
-                                try:
-                                    error_response = {"status": "error", "message": str(e)}
-                                    client.sendall(json.dumps(error_response).encode('utf-8'))
-                                except:
-                                    pass
-                            return None
-                        
-                        bpy.app.timers.register(execute_wrapper, first_interval=0.0)
-                    except json.JSONDecodeError:
-                        pass
-                except Exception as e:
-                    print(f"Error receiving data: {str(e)}")
-                    break
-        except Exception as e:
-            print(f"Error in client handler: {str(e)}")
-        finally:
-            try:
-                client.close()
-            except:
-                pass
-            print("Client handler stopped")
+    # The first map of each role is wired up, the others are only added to the tree
+    texture_nodes = []
+    by_role = {}
+    for index, (map_type, image) in enumerate(images_by_maptype.items()):
+        tex_node = nodes.new(type='ShaderNodeTexImage')
+        tex_node.location = (-400, 300 - 250 * index)
+        tex_node.image = image
+        texture_nodes.append(tex_node)
+        by_role.setdefault(_MAP_ROLE.get(map_type.lower()), tex_node)
+    
+    base_color = by_role.get('base')
+    roughness = by_role.get('rough')
+    metallic = by_role.get('metal')
+    normal = by_role.get('normal') or by_role.get('normal_dx')
+    displacement = by_role.get('disp')
+    ao = by_role.get('ao')
+    arm = by_role.get('arm')
+    
+    if normal:
+        normal_map = nodes.new(type='ShaderNodeNormalMap')
+        normal_map.location = (100, 100)
+    if displacement:
+        disp_node = nodes.new(type='ShaderNodeDisplacement')
+        disp_node.location = (300, -200)
+        disp_node.inputs['Scale'].default_value = 0.1
+    if arm:
+        # ARM packs ambient occlusion, roughness and metallic into R, G and B
+        separate_rgb = nodes.new(type='ShaderNodeSeparateRGB')
+        separate_rgb.location = (-200, -100)
+    if base_color and (ao or arm):
+        mix_node = nodes.new(type='ShaderNodeMixRGB')
+        mix_node.location = (100, 200)
+        mix_node.blend_type = 'MULTIPLY'
+        mix_node.inputs['Fac'].default_value = 0.8
+    
+    links.new(principled.outputs[0], output.inputs[0])
+    links.new(tex_coord.outputs['UV'], mapping.inputs['Vector'])
+    for tex_node in texture_nodes:
+        links.new(mapping.outputs['Vector'], tex_node.inputs['Vector'])
+    
+    if arm:
+        links.new(arm.outputs['Color'], separate_rgb.inputs['Image'])
+    
+    if base_color:
+        if ao or arm:
+            # Darken the base colour by the ambient occlusion, from the AO map or the ARM red channel
+            links.new(base_color.outputs['Color'], mix_node.inputs[1])
+            links.new(ao.outputs['Color'] if ao else separate_rgb.outputs['R'], mix_node.inputs[2])
+            links.new(mix_node.outputs['Color'], _principled_input(principled, 'Base Color'))
+        else:
+            links.new(base_color.outputs['Color'], _principled_input(principled, 'Base Color'))
+    
+    if roughness:
+        links.new(roughness.outputs['Color'], _principled_input(principled, 'Roughness'))
+    elif arm:
+        links.new(separate_rgb.outputs['G'], _principled_input(principled, 'Roughness'))
+    
+    if metallic:
+        links.new(metallic.outputs['Color'], _principled_input(principled, 'Metallic'))
+    elif arm:
+        links.new(separate_rgb.outputs['B'], _principled_input(principled, 'Metallic'))
+    
+    if normal:
+        links.new(normal.outputs['Color'], normal_map.inputs['Color'])
+        links.new(normal_map.outputs['Normal'], _principled_input(principled, 'Normal'))
+    
+    if displacement:
+        links.new(displacement.outputs['Color'], disp_node.inputs['Height'])
+        links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
+    
+    return mat
 
-    def execute_command(self, command):
-        """Execute a command in the main Blender thread"""
-        try:            
-            return self._execute_command_internal(command)
-        except Exception as e:
-            print(f"Error executing command: {str(e)}")
-            traceback.print_exc()
-            return {"status": "error", "message": str(e)}
+# Names of the map images downloaded per texture asset, so set_texture need not scan bpy.data.images
+_PH_TEXTURE_INDEX = {}
 
-    def _execute_command_internal(self, command):
-        """Internal command execution with proper context"""
-        cmd_type = command.get("type")
-        params = command.get("params", {})
+PRIMITIVE_OPS = {
+    "CUBE": bpy.ops.mesh.primitive_cube_add,
+    "SPHERE": bpy.ops.mesh.primitive_uv_sphere_add,
+    "CYLINDER": bpy.ops.mesh.primitive_cylinder_add,
+    "CONE": bpy.ops.mesh.primitive_cone_add,
+    "TORUS": bpy.ops.mesh.primitive_torus_add,
+    "MONKEY": bpy.ops.mesh.primitive_monkey_add,
+    "PLANE": bpy.ops.mesh.primitive_plane_add,
+    "CIRCLE": bpy.ops.mesh.primitive_circle_add,
+}
+
+# The torus operator is written in Python and only takes location and rotation
+PRIMITIVES_WITHOUT_SCALE = frozenset({"TORUS"})
+
+MERGE_TYPES = frozenset({"CENTER", "CURSOR", "COLLAPSE", "FIRST", "LAST"})
+
+class _ClientConnection:
+    """Receive state of one client connection"""
+    def __init__(self, sock):
+        self.sock = sock
+        self.framed = None  # decided by the first byte the client sends
+        # Preallocated receive buffer, grown only for frames larger than it
+        self.recv_buffer = bytearray(65536)
+        self.used = 0
+        # Unframed clients: decoded text not yet parsed into a command
+        self.utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.pending = ''
+        # Responses in command order, a Future while a deferred command is still running
+        self.replies = collections.deque()
+
+@bpy.app.handlers.persistent
+def _clear_server_caches(*args):
+    """Undo/redo/load handler: drop the running server's cached object data
+    
+    Module-level and persistent, Blender removes other handlers when a file loads.
+    """
+    server = getattr(bpy.types, "blendermcp_server", None)
+    if server is not None:
+        server._clear_object_cache()
+
+@bpy.app.handlers.persistent
+def _resubscribe_server(*args):
+    """Load handler: file loads drop every msgbus subscription, make them again"""
+    server = getattr(bpy.types, "blendermcp_server", None)
+    if server is not None and server.running:
+        server._subscribe_status_changes()
+
+class BlenderMCPServer:
+    def __init__(self, host='localhost', port=9876):
+        self.host = host
+        self.port = port
+        self.running = False
+        self.socket = None
+        self._selector = None
+        self._io_pool = None
+        # Timers are matched by identity and each self._poll lookup makes a new
+        # bound method, so keep the one that was registered
+        self._poll_timer = None
+        # Shared by every connection instead of the fresh decoder json.loads builds per call
+        self._decoder = json.JSONDecoder()
+        # Tracebacks and per-command logging are opt-in, set BLENDER_MCP_DEBUG=1 to enable
+        self._debug = os.environ.get('BLENDER_MCP_DEBUG', '').lower() in {'1', 'true', 'yes', 'on'}
+        self._obj_cache = {}
+        self._aabb_cache = {}
+        self._principled_cache = {}
+        # set_texture results by (object name, texture id, detail), valid while the object keeps that material
+        self._set_texture_cache = {}
+        # Integration status replies, rebuilt only after one of STATUS_PROPERTIES changes
+        self._status_cache = {"polyhaven": None, "hyper3d": None}
+        self._msgbus_owner = object()
+        self._exec_namespace = {"bpy": bpy, "mathutils": mathutils, "__name__": "__mcp__"}
+        self._exec_output = io.StringIO()
 
-        # Base handlers always available
-        handlers = {
+        # Command dispatch tables, built once per server
+        self._base_handlers = {
             # Scene & Object Info
             "get_scene_info": self.get_scene_info,
             "get_object_info": self.get_object_info,
@@ -184,6 +379,7 @@ class BlenderMCPServer:
             
             # Object Manipulation
             "transform_object": self.transform_object,
+            "set_object_transforms_batch": self.set_object_transforms_batch,
             "duplicate_object": self.duplicate_object,
             "delete_object": self.delete_object,
             "rename_object": self.rename_object,
@@ -200,6 +396,7 @@ class BlenderMCPServer:
             "inset_faces": self.inset_faces,
             "loop_cut": self.loop_cut,
             "merge_vertices": self.merge_vertices,
+            "edit_batch": self.edit_batch,
             
             # Modifiers
             "add_modifier": self.add_modifier,
@@ -215,6 +412,7 @@ class BlenderMCPServer:
             
             # Animation
             "set_keyframe": self.set_keyframe,
+            "set_keyframes": self.set_keyframes,
             "set_frame": self.set_frame,
             "get_frame_range": self.get_frame_range,
             
@@ -231,86 +429,452 @@ class BlenderMCPServer:
             "get_polyhaven_status": self.get_polyhaven_status,
             "get_hyper3d_status": self.get_hyper3d_status,
         }
+        self._polyhaven_handlers = {
+            "get_polyhaven_categories": self.get_polyhaven_categories,
+            "search_polyhaven_assets": self.search_polyhaven_assets,
+            "download_polyhaven_asset": self.download_polyhaven_asset,
+            "set_texture": self.set_texture,
+        }
+        self._mesh_edit_ops = {
+            "extrude": self._bm_extrude,
+            "subdivide": self._bm_subdivide,
+            "bevel": self._bm_bevel,
+            "inset": self._bm_inset,
+            "merge": self._bm_merge,
+        }
+        self._hyper3d_handlers = {
+            "create_rodin_job": self.create_rodin_job,
+            "poll_rodin_job_status": self.poll_rodin_job_status,
+            "wait_for_rodin_job": self.wait_for_rodin_job,
+            "wait_and_import_rodin_job": self.wait_and_import_rodin_job,
+            "poll_rodin_jobs_batch": self.poll_rodin_jobs_batch,
+            "import_generated_asset": self.import_generated_asset,
+        }
+        # Hyper3D implementations per blendermcp_hyper3d_mode
+        self._rodin_create = {
+            "MAIN_SITE": self.create_rodin_job_main_site,
+            "FAL_AI": self.create_rodin_job_fal_ai,
+        }
+        self._rodin_poll = {
+            "MAIN_SITE": self.poll_rodin_job_status_main_site,
+            "FAL_AI": self.poll_rodin_job_status_fal_ai,
+        }
+        self._rodin_import = {
+            "MAIN_SITE": self.import_generated_asset_main_site,
+            "FAL_AI": self.import_generated_asset_fal_ai,
+        }
+    
+    def start(self):
+        if self.running:
+            print("Server is already running")
+            return
+            
+        self.running = True
         
-        # Add Polyhaven handlers if enabled
-        if bpy.context.scene.blendermcp_use_polyhaven:
-            polyhaven_handlers = {
-                "get_polyhaven_categories": self.get_polyhaven_categories,
-                "search_polyhaven_assets": self.search_polyhaven_assets,
-                "download_polyhaven_asset": self.download_polyhaven_asset,
-                "set_texture": self.set_texture,
-            }
-            handlers.update(polyhaven_handlers)
-        
-        # Add Hyper3d handlers if enabled
-        if bpy.context.scene.blendermcp_use_hyper3d:
-            hyper3d_handlers = {
-                "create_rodin_job": self.create_rodin_job,
-                "poll_rodin_job_status": self.poll_rodin_job_status,
-                "import_generated_asset": self.import_generated_asset,
-            }
-            handlers.update(hyper3d_handlers)
+        try:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            # Set before listen() so the TCP window scale is negotiated for the larger buffers
+            self._tune_buffers(self.socket)
+            self.socket.bind((self.host, self.port))
+            self.socket.listen(1)
+            self.socket.setblocking(False)
+            
+            # One selector multiplexes the listening socket and every client;
+            # key.data is None for the listener and the connection state otherwise
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(self.socket, selectors.EVENT_READ)
+            
+            self._io_pool = concurrent.futures.ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="blendermcp-io")
+            
+            # Undo and file loads invalidate every cached object reference
+            for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post, bpy.app.handlers.load_post):
+                if _clear_server_caches not in handlers:
+                    handlers.append(_clear_server_caches)
+            
+            self._subscribe_status_changes()
+            if _resubscribe_server not in bpy.app.handlers.load_post:
+                bpy.app.handlers.load_post.append(_resubscribe_server)
+            
+            # Poll the selector from a main-thread timer; persistent so the
+            # server keeps running across file loads
+            self._poll_timer = self._poll
+            bpy.app.timers.register(self._poll_timer, first_interval=POLL_INTERVAL, persistent=True)
+            
+            print(f"Enhanced BlenderMCP server started on {self.host}:{self.port}")
+        except Exception as e:
+            print(f"Failed to start server: {str(e)}")
+            self.stop()
+            
+    def stop(self):
+        self.running = False
+        for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post, bpy.app.handlers.load_post):
+            if _clear_server_caches in handlers:
+                handlers.remove(_clear_server_caches)
+        if _resubscribe_server in bpy.app.handlers.load_post:
+            bpy.app.handlers.load_post.remove(_resubscribe_server)
+        bpy.msgbus.clear_by_owner(self._msgbus_owner)
+        self._clear_object_cache()
+        if self._poll_timer is not None:
+            if bpy.app.timers.is_registered(self._poll_timer):
+                bpy.app.timers.unregister(self._poll_timer)
+            self._poll_timer = None
+        if self._selector:
+            for key in list(self._selector.get_map().values()):
+                if key.data is not None:
+                    self._close_client(key.data)
+            self._selector.close()
+            self._selector = None
+        if self._io_pool:
+            self._io_pool.shutdown(wait=False, cancel_futures=True)
+            self._io_pool = None
+        if self.socket:
+            try:
+                self.socket.close()
+            except:
+                pass
+            self.socket = None
+        print("Enhanced BlenderMCP server stopped")
+    
+    def _poll(self):
+        """Service every socket that is ready, runs as a timer on the main thread"""
+        if not self.running:
+            return None
+        
+        for key, _ in self._selector.select(timeout=0):
+            if key.data is None:
+                self._accept_clients()
+            else:
+                self._read_client(key.data)
+        
+        return POLL_INTERVAL
+    
+    def _accept_clients(self):
+        while True:
+            try:
+                client, address = self.socket.accept()
+            except BlockingIOError:
+                return
+            except Exception as e:
+                print(f"Error accepting connection: {str(e)}")
+                return
+            print(f"Connected to client: {address}")
+            client.setblocking(False)
+            # Commands are small request/response messages, don't let Nagle hold them back
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._tune_buffers(client)
+            self._selector.register(client, selectors.EVENT_READ, _ClientConnection(client))
+    
+    def _read_client(self, conn):
+        """Read whatever a client has sent and run every complete command"""
+        try:
+            while True:
+                try:
+                    with memoryview(conn.recv_buffer) as view:
+                        nbytes = conn.sock.recv_into(view[conn.used:])
+                except BlockingIOError:
+                    return
+                if not nbytes:
+                    print("Client disconnected")
+                    break
+                if conn.framed is None:
+                    # Legacy clients send bare JSON objects back to back
+                    conn.framed = conn.recv_buffer[0] not in JSON_STREAM_START
+                conn.used += nbytes
+                if conn.framed:
+                    self._receive_frames(conn)
+                else:
+                    self._receive_json_stream(conn)
+        except Exception as e:
+            print(f"Error in client handler: {str(e)}")
+        
+        self._close_client(conn)
+    
+    @staticmethod
+    def _tune_buffers(sock):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+    
+    def _close_client(self, conn):
+        try:
+            self._selector.unregister(conn.sock)
+        except (KeyError, ValueError):
+            pass
+        try:
+            conn.sock.close()
+        except:
+            pass
+
+    def _receive_json_stream(self, conn):
+        """Parse unframed commands, using the closing braces to find message ends"""
+        with memoryview(conn.recv_buffer) as view:
+            text = conn.utf8.decode(view[:conn.used])
+        conn.used = 0
+        conn.pending += text
+        # A command can only have completed if a closing brace arrived
+        if '}' not in text:
+            return
+        
+        # Run every complete command, keep the partial tail for later
+        pending = conn.pending
+        idx = 0
+        end = len(pending)
+        while True:
+            while idx < end and pending[idx].isspace():
+                idx += 1
+            if idx >= end:
+                break
+            try:
+                command, idx = self._decoder.raw_decode(pending, idx)
+            except json.JSONDecodeError:
+                break
+            self._run_command(conn, command)
+        conn.pending = pending[idx:]
+
+    def _receive_frames(self, conn):
+        """Parse commands sent as a 4-byte big-endian length followed by the JSON payload"""
+        recv_buffer = conn.recv_buffer
+        used = conn.used
+        
+        # Run every complete frame already buffered
+        start = 0
+        while used - start >= FRAME_HEADER.size:
+            (size,) = FRAME_HEADER.unpack_from(recv_buffer, start)
+            if size > MAX_FRAME_SIZE:
+                raise ValueError(f"Frame of {size} bytes exceeds the {MAX_FRAME_SIZE} byte limit")
+            frame_end = start + FRAME_HEADER.size + size
+            if frame_end > used:
+                break
+            # Decoded by _run_command so a malformed payload gets an error reply
+            self._run_command(conn, recv_buffer[start + FRAME_HEADER.size:frame_end])
+            start = frame_end
+        
+        if start:
+            del recv_buffer[:start]
+            used -= start
+            recv_buffer.extend(bytes(start))
+        
+        # Make room for the rest of a frame larger than the buffer
+        if used >= FRAME_HEADER.size:
+            needed = FRAME_HEADER.size + FRAME_HEADER.unpack_from(recv_buffer)[0]
+            if needed > len(recv_buffer):
+                recv_buffer.extend(bytes(needed - len(recv_buffer)))
+        
+        conn.used = used
+
+    def _run_command(self, conn, command):
+        """Execute a command, given decoded or as a frame payload, and send the response back"""
+        try:
+            if isinstance(command, bytearray):
+                command = self._decoder.decode(command.decode('utf-8'))
+            response = self.execute_command(command)
+        except Exception as e:
+            print(f"Error executing command: {str(e)}")
+            if self._debug:
+                traceback.print_exc()
+            response = {"status": "error", "message": str(e)}
+        
+        conn.replies.append(response)
+        if isinstance(response, concurrent.futures.Future):
+            response.add_done_callback(lambda _: self._flush_replies(conn))
+        self._flush_replies(conn)
+
+    def _flush_replies(self, conn):
+        """Send finished responses in command order, stopping at one still being worked on"""
+        replies = conn.replies
+        while replies:
+            response = replies[0]
+            if isinstance(response, concurrent.futures.Future):
+                if not response.done():
+                    return
+                try:
+                    response = {"status": "success", "result": response.result()}
+                except Exception as e:
+                    print(f"Error in handler: {str(e)}")
+                    response = {"status": "error", "message": str(e)}
+            replies.popleft()
+            try:
+                self._send_response(conn, response)
+            except:
+                print("Failed to send response - client disconnected")
+
+    def _defer(self, work, finish=None):
+        """Run work() on the I/O pool and return a Future for the command's result
+        
+        finish, if given, is called on the main thread with the result of work
+        and returns the command's result. The Future is always resolved on the
+        main thread, so its response is sent from there too.
+        """
+        task = self._io_pool.submit(work)
+        reply = concurrent.futures.Future()
+        
+        def check():
+            if not task.done():
+                return IO_CHECK_INTERVAL
+            try:
+                result = task.result()
+                reply.set_result(finish(result) if finish else result)
+            except Exception as e:
+                if self._debug:
+                    traceback.print_exc()
+                reply.set_exception(e)
+            return None
+        
+        bpy.app.timers.register(check, first_interval=IO_CHECK_INTERVAL, persistent=True)
+        return reply
+
+    def _send_response(self, conn, response):
+        payload = _dumps(response)
+        # Block for the write so large responses are not cut short by a full send buffer
+        conn.sock.settimeout(SEND_TIMEOUT)
+        try:
+            if conn.framed:
+                self._send_buffers(conn.sock, [FRAME_HEADER.pack(len(payload)), payload])
+            else:
+                conn.sock.sendall(payload)
+        finally:
+            conn.sock.setblocking(False)
+
+    @staticmethod
+    def _send_buffers(sock, buffers):
+        """Send several byte buffers with gathered writes instead of concatenating them"""
+        if not hasattr(sock, 'sendmsg'):
+            # Windows sockets have no sendmsg
+            for buffer in buffers:
+                sock.sendall(buffer)
+            return
+        
+        views = [memoryview(buffer) for buffer in buffers if buffer]
+        while views:
+            sent = sock.sendmsg(views)
+            # Drop the buffers that went out completely, trim a partially sent one
+            while views and sent >= len(views[0]):
+                sent -= len(views.pop(0))
+            if sent:
+                views[0] = views[0][sent:]
+
+    def execute_command(self, command):
+        """Execute a command in the main Blender thread"""
+        try:            
+            return self._execute_command_internal(command)
+        except Exception as e:
+            print(f"Error executing command: {str(e)}")
+            if self._debug:
+                traceback.print_exc()
+            return {"status": "error", "message": str(e)}
+
+    def _execute_command_internal(self, command):
+        """Internal command execution with proper context"""
+        cmd_type = command.get("type")
+        params = command.get("params", {})
+
+        # Base handlers always available, integrations only when enabled
+        handler = self._base_handlers.get(cmd_type)
+        if handler is None:
+            scene = bpy.context.scene
+            if scene.blendermcp_use_polyhaven:
+                handler = self._polyhaven_handlers.get(cmd_type)
+            if handler is None and scene.blendermcp_use_hyper3d:
+                handler = self._hyper3d_handlers.get(cmd_type)
+                if handler is not None:
+                    # Read the scene settings once and hand them down instead of every request re-reading RNA
+                    params = {**params, "cfg": self._hyper3d_config(scene)}
 
-        handler = handlers.get(cmd_type)
         if handler:
             try:
-                print(f"Executing handler for {cmd_type}")
+                if self._debug:
+                    print(f"Executing handler for {cmd_type}")
                 result = handler(**params)
-                print(f"Handler execution complete")
+                if self._debug:
+                    print(f"Handler execution complete")
+                # Handlers doing slow I/O hand back a Future, the response is sent once it resolves
+                if isinstance(result, concurrent.futures.Future):
+                    return result
                 return {"status": "success", "result": result}
             except Exception as e:
                 print(f"Error in handler: {str(e)}")
-                traceback.print_exc()
+                if self._debug:
+                    traceback.print_exc()
                 return {"status": "error", "message": str(e)}
         else:
             return {"status": "error", "message": f"Unknown command type: {cmd_type}"}
 
     # ===== SCENE & OBJECT INFO =====
     
-    def get_scene_info(self):
+    def get_scene_info(self, max_objects=10):
         """Get comprehensive information about the current scene"""
         try:
-            print("Getting scene info...")
+            if self._debug:
+                print("Getting scene info...")
+            scene = bpy.context.scene
+            objects = scene.objects
+            object_count = len(objects)
             scene_info = {
-                "name": bpy.context.scene.name,
-                "frame_current": bpy.context.scene.frame_current,
-                "frame_start": bpy.context.scene.frame_start,
-                "frame_end": bpy.context.scene.frame_end,
-                "object_count": len(bpy.context.scene.objects),
+                "name": scene.name,
+                "frame_current": scene.frame_current,
+                "frame_start": scene.frame_start,
+                "frame_end": scene.frame_end,
+                "object_count": object_count,
                 "objects": [],
                 "materials_count": len(bpy.data.materials),
                 "collections": [c.name for c in bpy.data.collections],
             }
             
-            for i, obj in enumerate(bpy.context.scene.objects):
-                if i >= 10:
-                    break
-                obj_info = {
-                    "name": obj.name,
-                    "type": obj.type,
-                    "location": [round(float(obj.location.x), 2), 
-                                round(float(obj.location.y), 2), 
-                                round(float(obj.location.z), 2)],
-                }
-                scene_info["objects"].append(obj_info)
+            listed = list(itertools.islice(objects, max_objects))
+            if object_count <= max_objects * 4:
+                # One C-level copy of every location; a float32 buffer matches the RNA type,
+                # so foreach_get copies raw memory instead of setting items one by one
+                locations = np.empty(object_count * 3, dtype=np.float32)
+                objects.foreach_get("location", locations)
+                locations = locations.reshape(-1, 3)[:max_objects]
+            else:
+                # Only a few of many objects are listed, reading the whole scene would cost more
+                locations = np.array([obj.location for obj in listed], dtype=np.float32).reshape(-1, 3)
+            locations = np.round(locations.astype(float), 2).tolist()
+            
+            scene_info["objects"] = [
+                {"name": obj.name, "type": obj.type, "location": location}
+                for obj, location in zip(listed, locations)
+            ]
             
-            print(f"Scene info collected: {len(scene_info['objects'])} objects")
+            if self._debug:
+                print(f"Scene info collected: {len(scene_info['objects'])} objects")
             return scene_info
         except Exception as e:
             print(f"Error in get_scene_info: {str(e)}")
-            traceback.print_exc()
+            if self._debug:
+                traceback.print_exc()
             return {"error": str(e)}
     
-    @staticmethod
-    def _get_aabb(obj):
+    def _get_aabb(self, obj):
         """Returns the world-space axis-aligned bounding box (AABB) of an object."""
         if obj.type != 'MESH':
             raise TypeError("Object must be a mesh")
-        local_bbox_corners = [mathutils.Vector(corner) for corner in obj.bound_box]
-        world_bbox_corners = [obj.matrix_world @ corner for corner in local_bbox_corners]
-        min_corner = mathutils.Vector(map(min, zip(*world_bbox_corners)))
-        max_corner = mathutils.Vector(map(max, zip(*world_bbox_corners)))
-        return [[*min_corner], [*max_corner]]
+        # Reuse the last result while neither the transform nor the local bounds changed
+        matrix = tuple(value for row in obj.matrix_world for value in row)
+        corners = tuple(value for corner in obj.bound_box for value in corner)
+        cached = self._aabb_cache.get(obj.name)
+        if cached is not None and cached[0] == matrix and cached[1] == corners:
+            return cached[2]
+        
+        # Imported Hyper3D meshes carry their box on the object, which outlives undo and reloads
+        stored = obj.get("_mcp_world_bbox")
+        if stored is not None and tuple(obj.get("_mcp_world_bbox_key", ())) == matrix + corners:
+            stored = stored.to_list()
+            aabb = [stored[:3], stored[3:]]
+        else:
+            matrix_world = np.array(matrix).reshape(4, 4)
+            world_corners = np.array(corners).reshape(8, 3) @ matrix_world[:3, :3].T + matrix_world[:3, 3]
+            aabb = [world_corners.min(axis=0).tolist(), world_corners.max(axis=0).tolist()]
+        self._aabb_cache[obj.name] = (matrix, corners, aabb)
+        return aabb
+
+    def _store_aabb(self, obj):
+        """Keep the AABB last computed for obj as custom properties on the object"""
+        matrix, corners, aabb = self._aabb_cache[obj.name]
+        # Underscore names keep them out of the Custom Properties panel
+        obj["_mcp_world_bbox"] = aabb[0] + aabb[1]
+        obj["_mcp_world_bbox_key"] = matrix + corners
 
     def get_object_info(self, name):
         """Get detailed information about a specific object"""
@@ -349,15 +913,75 @@ class BlenderMCPServer:
     def execute_code(self, code):
         """Execute arbitrary Blender Python code"""
         try:
-            namespace = {"bpy": bpy}
-            capture_buffer = io.StringIO()
+            # Globals persist between snippets, so earlier definitions stay usable
+            capture_buffer = self._exec_output
+            capture_buffer.seek(0)
+            capture_buffer.truncate()
             with redirect_stdout(capture_buffer):
-                exec(code, namespace)
+                exec(_compile_code(code), self._exec_namespace)
             captured_output = capture_buffer.getvalue()
             return {"executed": True, "result": captured_output}
         except Exception as e:
             raise Exception(f"Code execution error: {str(e)}")
 
+    def _resolve(self, name):
+        """Look up an object by name, reusing the reference from earlier commands"""
+        obj = self._obj_cache.get(name)
+        if obj is not None:
+            try:
+                # Objects renamed or deleted behind our back are looked up again
+                if obj.name == name:
+                    return obj
+            except ReferenceError:
+                pass
+        obj = bpy.data.objects.get(name)
+        if obj is not None:
+            self._obj_cache[name] = obj
+        else:
+            self._obj_cache.pop(name, None)
+        return obj
+
+    def _require_object(self, name):
+        """Look up an object by name, raising if it does not exist"""
+        obj = self._resolve(name)
+        if obj is None:
+            raise ValueError(f"Object not found: {name}")
+        return obj
+
+    @staticmethod
+    def _require_material(name):
+        """Look up a material by name, raising if it does not exist"""
+        mat = bpy.data.materials.get(name)
+        if mat is None:
+            raise ValueError(f"Material not found: {name}")
+        return mat
+
+    def _clear_object_cache(self, *args):
+        """Drop all cached object data"""
+        self._obj_cache.clear()
+        self._aabb_cache.clear()
+        self._principled_cache.clear()
+        self._set_texture_cache.clear()
+        self._clear_status_cache()
+
+    def _subscribe_status_changes(self):
+        """Clear the status replies whenever the integration settings change or the scene is switched"""
+        bpy.msgbus.clear_by_owner(self._msgbus_owner)
+        for key in [(bpy.types.Scene, prop) for prop in STATUS_PROPERTIES] + [(bpy.types.Window, "scene")]:
+            bpy.msgbus.subscribe_rna(
+                key=key,
+                owner=self._msgbus_owner,
+                args=(),
+                notify=self._clear_status_cache,
+            )
+        # Anything may have changed while nobody was subscribed
+        self._clear_status_cache()
+
+    def _clear_status_cache(self, *args):
+        """Forget the integration status replies (msgbus callback)"""
+        self._status_cache["polyhaven"] = None
+        self._status_cache["hyper3d"] = None
+
     # ===== OBJECT CREATION =====
     
     def add_primitive(self, primitive_type="CUBE", location=[0, 0, 0], rotation=[0, 0, 0], scale=[1, 1, 1], name=None):
@@ -366,25 +990,18 @@ class BlenderMCPServer:
         Types: CUBE, SPHERE, CYLINDER, CONE, TORUS, MONKEY, PLANE, CIRCLE
         Example: add_primitive(primitive_type="SPHERE", location=[0, 0, 2], scale=[2, 2, 2])
         """
-        primitive_ops = {
-            "CUBE": lambda: bpy.ops.mesh.primitive_cube_add(),
-            "SPHERE": lambda: bpy.ops.mesh.primitive_uv_sphere_add(),
-            "CYLINDER": lambda: bpy.ops.mesh.primitive_cylinder_add(),
-            "CONE": lambda: bpy.ops.mesh.primitive_cone_add(),
-            "TORUS": lambda: bpy.ops.mesh.primitive_torus_add(),
-            "MONKEY": lambda: bpy.ops.mesh.primitive_monkey_add(),
-            "PLANE": lambda: bpy.ops.mesh.primitive_plane_add(),
-            "CIRCLE": lambda: bpy.ops.mesh.primitive_circle_add(),
-        }
-        
-        if primitive_type not in primitive_ops:
+        primitive_op = PRIMITIVE_OPS.get(primitive_type)
+        if primitive_op is None:
             raise ValueError(f"Invalid primitive type: {primitive_type}")
         
-        primitive_ops[primitive_type]()
-        obj = bpy.context.active_object
-        obj.location = mathutils.Vector(location)
-        obj.rotation_euler = mathutils.Euler(rotation)
-        obj.scale = mathutils.Vector(scale)
+        # The operator places the new object, so it never exists with the default transform
+        if primitive_type in PRIMITIVES_WITHOUT_SCALE:
+            primitive_op(location=location, rotation=rotation)
+            obj = bpy.context.active_object
+            obj.scale = scale
+        else:
+            primitive_op(location=location, rotation=rotation, scale=scale)
+            obj = bpy.context.active_object
         
         if name:
             obj.name = name
@@ -404,7 +1021,7 @@ class BlenderMCPServer:
         
         curve_ops[curve_type]()
         obj = bpy.context.active_object
-        obj.location = mathutils.Vector(location)
+        obj.location = location
         
         if name:
             obj.name = name
@@ -416,7 +1033,7 @@ class BlenderMCPServer:
         bpy.ops.object.text_add()
         obj = bpy.context.active_object
         obj.data.body = text
-        obj.location = mathutils.Vector(location)
+        obj.location = location
         
         if name:
             obj.name = name
@@ -427,7 +1044,7 @@ class BlenderMCPServer:
         """Add an empty object. Types: PLAIN_AXES, ARROWS, SINGLE_ARROW, CIRCLE, CUBE, SPHERE, CONE"""
         bpy.ops.object.empty_add(type=empty_type)
         obj = bpy.context.active_object
-        obj.location = mathutils.Vector(location)
+        obj.location = location
         
         if name:
             obj.name = name
@@ -438,7 +1055,7 @@ class BlenderMCPServer:
         """Add a light. Types: POINT, SUN, SPOT, AREA"""
         bpy.ops.object.light_add(type=light_type)
         obj = bpy.context.active_object
-        obj.location = mathutils.Vector(location)
+        obj.location = location
         obj.data.energy = energy
         
         if name:
@@ -450,8 +1067,8 @@ class BlenderMCPServer:
         """Add a camera"""
         bpy.ops.object.camera_add()
         obj = bpy.context.active_object
-        obj.location = mathutils.Vector(location)
-        obj.rotation_euler = mathutils.Euler(rotation)
+        obj.location = location
+        obj.rotation_euler = rotation
         
         if name:
             obj.name = name
@@ -460,29 +1077,75 @@ class BlenderMCPServer:
 
     # ===== OBJECT MANIPULATION =====
     
+    @staticmethod
+    def _make_active(obj):
+        """Make obj the only selected object and the active one"""
+        # Only touch objects that are actually selected instead of select_all
+        for selected in bpy.context.selected_objects:
+            selected.select_set(False)
+        obj.select_set(True)
+        bpy.context.view_layer.objects.active = obj
+
+    @classmethod
+    def _with_active(cls, *objects):
+        """Context override that runs operators on objects, the first one active,
+        without changing the selection in the view layer"""
+        if not hasattr(bpy.context, "temp_override"):
+            # Blender < 3.2 has no temp_override, change the real selection instead
+            cls._make_active(objects[0])
+            for obj in objects[1:]:
+                obj.select_set(True)
+            return nullcontext()
+        selected = list(objects)
+        return bpy.context.temp_override(
+            object=objects[0],
+            active_object=objects[0],
+            selected_objects=selected,
+            selected_editable_objects=selected,
+        )
+    
+    def set_object_transforms_batch(self, transforms):
+        """
+        Set the transform of many objects in one command.
+        Example: set_object_transforms_batch(transforms=[{"name": "Cube", "location": [0, 0, 1], "rotation": [0, 0, 0], "scale": [1, 1, 1]}])
+        """
+        # Resolve everything first so an unknown name leaves the scene untouched
+        objects = [self._require_object(item["name"]) for item in transforms]
+        
+        for obj, item in zip(objects, transforms):
+            location = item.get("location")
+            rotation = item.get("rotation")
+            scale = item.get("scale")
+            if location:
+                obj.location = location
+            if rotation:
+                obj.rotation_euler = rotation
+            if scale:
+                obj.scale = scale
+        
+        return {"count": len(objects)}
+    
     def transform_object(self, name, location=None, rotation=None, scale=None, relative=False):
         """Transform an object (move, rotate, scale)"""
-        obj = bpy.data.objects.get(name)
-        if not obj:
-            raise ValueError(f"Object not found: {name}")
+        obj = self._require_object(name)
         
         if location:
             if relative:
                 obj.location += mathutils.Vector(location)
             else:
-                obj.location = mathutils.Vector(location)
+                obj.location = location
         
         if rotation:
             if relative:
                 obj.rotation_euler.rotate(mathutils.Euler(rotation))
             else:
-                obj.rotation_euler = mathutils.Euler(rotation)
+                obj.rotation_euler = rotation
         
         if scale:
             if relative:
-                obj.scale = mathutils.Vector([obj.scale[i] * scale[i] for i in range(3)])
+                obj.scale = (obj.scale[0] * scale[0], obj.scale[1] * scale[1], obj.scale[2] * scale[2])
             else:
-                obj.scale = mathutils.Vector(scale)
+                obj.scale = scale
         
         return {
             "name": obj.name,
@@ -493,41 +1156,41 @@ class BlenderMCPServer:
     
     def duplicate_object(self, name, linked=False):
         """Duplicate an object"""
-        obj = bpy.data.objects.get(name)
-        if not obj:
-            raise ValueError(f"Object not found: {name}")
+        obj = self._require_object(name)
         
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
-        
-        bpy.ops.object.duplicate(linked=linked)
-        new_obj = bpy.context.active_object
+        # Copy through the data API; the duplicate operator works on the
+        # view layer selection and would need the whole scene deselected
+        new_obj = obj.copy()
+        if obj.data is not None and not linked:
+            new_obj.data = obj.data.copy()
+        for collection in obj.users_collection:
+            collection.objects.link(new_obj)
+        self._make_active(new_obj)
         
         return {"name": new_obj.name, "original": name}
     
     def delete_object(self, name):
         """Delete an object"""
-        obj = bpy.data.objects.get(name)
-        if not obj:
-            raise ValueError(f"Object not found: {name}")
+        obj = self._require_object(name)
         
+        self._obj_cache.pop(name, None)
+        self._aabb_cache.pop(name, None)
         bpy.data.objects.remove(obj, do_unlink=True)
         return {"deleted": name}
     
     def rename_object(self, old_name, new_name):
         """Rename an object"""
-        obj = bpy.data.objects.get(old_name)
-        if not obj:
-            raise ValueError(f"Object not found: {old_name}")
+        obj = self._require_object(old_name)
         
         obj.name = new_name
+        self._obj_cache.pop(old_name, None)
+        self._obj_cache[obj.name] = obj
         return {"old_name": old_name, "new_name": obj.name}
     
     def parent_object(self, child_name, parent_name, keep_transform=True):
         """Parent one object to another"""
-        child = bpy.data.objects.get(child_name)
-        parent = bpy.data.objects.get(parent_name)
+        child = self._resolve(child_name)
+        parent = self._resolve(parent_name)
         
         if not child or not parent:
             raise ValueError("Child or parent object not found")
@@ -540,17 +1203,13 @@ class BlenderMCPServer:
     
     def join_objects(self, object_names):
         """Join multiple objects into one"""
-        objects = [bpy.data.objects.get(name) for name in object_names]
+        objects = [self._resolve(name) for name in object_names]
         if any(obj is None for obj in objects):
             raise ValueError("One or more objects not found")
         
-        bpy.ops.object.select_all(action='DESELECT')
-        for obj in objects:
-            obj.select_set(True)
-        bpy.context.view_layer.objects.active = objects[0]
-        
-        bpy.ops.object.join()
-        result_obj = bpy.context.active_object
+        with self._with_active(*objects):
+            bpy.ops.object.join()
+        result_obj = objects[0]
         
         return {"name": result_obj.name, "joined_count": len(object_names)}
 
@@ -558,13 +1217,9 @@ class BlenderMCPServer:
     
     def enter_edit_mode(self, object_name):
         """Enter edit mode for an object"""
-        obj = bpy.data.objects.get(object_name)
-        if not obj:
-            raise ValueError(f"Object not found: {object_name}")
+        obj = self._require_object(object_name)
         
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
+        self._make_active(obj)
         bpy.ops.object.mode_set(mode='EDIT')
         
         return {"object": object_name, "mode": "EDIT"}
@@ -585,93 +1240,55 @@ class BlenderMCPServer:
     
     def extrude_mesh(self, object_name, distance=1.0, direction=[0, 0, 1]):
         """Extrude selected faces/edges/vertices"""
-        obj = bpy.data.objects.get(object_name)
+        obj = self._resolve(object_name)
         if not obj or obj.type != 'MESH':
             raise ValueError(f"Mesh object not found: {object_name}")
         
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
-        
-        if bpy.context.mode != 'EDIT_MESH':
-            bpy.ops.object.mode_set(mode='EDIT')
-        
-        bpy.ops.mesh.extrude_region_move(
-            TRANSFORM_OT_translate={
-                "value": tuple(d * distance for d in direction)
-            }
-        )
-        
-        bpy.ops.object.mode_set(mode='OBJECT')
+        bm = self._bm_edit(obj)
+        self._bm_extrude(bm, obj, distance, direction)
+        self._bm_finish(bm, obj)
         return {"object": object_name, "extruded": True}
     
     def subdivide_mesh(self, object_name, cuts=1):
         """Subdivide selected faces"""
-        obj = bpy.data.objects.get(object_name)
+        obj = self._resolve(object_name)
         if not obj or obj.type != 'MESH':
             raise ValueError(f"Mesh object not found: {object_name}")
         
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
-        
-        if bpy.context.mode != 'EDIT_MESH':
-            bpy.ops.object.mode_set(mode='EDIT')
-            bpy.ops.mesh.select_all(action='SELECT')
-        
-        bpy.ops.mesh.subdivide(number_cuts=cuts)
-        bpy.ops.object.mode_set(mode='OBJECT')
-        
+        bm = self._bm_edit(obj)
+        self._bm_subdivide(bm, obj, cuts)
+        self._bm_finish(bm, obj)
         return {"object": object_name, "cuts": cuts}
     
     def bevel_mesh(self, object_name, offset=0.1, segments=1):
         """Bevel selected edges"""
-        obj = bpy.data.objects.get(object_name)
+        obj = self._resolve(object_name)
         if not obj or obj.type != 'MESH':
             raise ValueError(f"Mesh object not found: {object_name}")
         
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
-        
-        if bpy.context.mode != 'EDIT_MESH':
-            bpy.ops.object.mode_set(mode='EDIT')
-            bpy.ops.mesh.select_all(action='SELECT')
-        
-        bpy.ops.mesh.bevel(offset=offset, segments=segments)
-        bpy.ops.object.mode_set(mode='OBJECT')
-        
+        bm = self._bm_edit(obj)
+        self._bm_bevel(bm, obj, offset, segments)
+        self._bm_finish(bm, obj)
         return {"object": object_name, "bevel_offset": offset}
     
     def inset_faces(self, object_name, thickness=0.1):
         """Inset selected faces"""
-        obj = bpy.data.objects.get(object_name)
+        obj = self._resolve(object_name)
         if not obj or obj.type != 'MESH':
             raise ValueError(f"Mesh object not found: {object_name}")
         
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
-        
-        if bpy.context.mode != 'EDIT_MESH':
-            bpy.ops.object.mode_set(mode='EDIT')
-            bpy.ops.mesh.select_all(action='SELECT')
-        
-        bpy.ops.mesh.inset(thickness=thickness)
-        bpy.ops.object.mode_set(mode='OBJECT')
-        
+        bm = self._bm_edit(obj)
+        self._bm_inset(bm, obj, thickness)
+        self._bm_finish(bm, obj)
         return {"object": object_name, "thickness": thickness}
     
     def loop_cut(self, object_name, number_cuts=1):
         """Add loop cuts to a mesh"""
-        obj = bpy.data.objects.get(object_name)
-        if not obj or obj.type != 'MESH':
-            raise ValueError(f"Mesh object not found: {object_name}")
-        
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
+        obj = self._resolve(object_name)
+        if not obj or obj.type != 'MESH':
+            raise ValueError(f"Mesh object not found: {object_name}")
         
+        self._make_active(obj)
         if bpy.context.mode != 'EDIT_MESH':
             bpy.ops.object.mode_set(mode='EDIT')
         
@@ -680,21 +1297,199 @@ class BlenderMCPServer:
     
     def merge_vertices(self, object_name, merge_type='CENTER'):
         """Merge selected vertices. Types: CENTER, CURSOR, COLLAPSE, FIRST, LAST"""
-        obj = bpy.data.objects.get(object_name)
+        obj = self._resolve(object_name)
         if not obj or obj.type != 'MESH':
             raise ValueError(f"Mesh object not found: {object_name}")
         
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
+        if merge_type not in MERGE_TYPES:
+            raise ValueError(f"Invalid merge type: {merge_type}")
+        self._bm_apply(obj, [(self._bm_merge, {"merge_type": merge_type})])
+        return {"object": object_name, "merge_type": merge_type}
+
+    def edit_batch(self, object_name, ops):
+        """
+        Apply a sequence of mesh edits to one object, loading and writing the mesh only once.
+        Ops: extrude (distance, direction), subdivide (cuts), bevel (offset, segments),
+        inset (thickness), merge (merge_type)
+        Example: edit_batch(object_name="Cube", ops=[{"op": "subdivide", "cuts": 2}, {"op": "bevel", "offset": 0.1}])
+        """
+        obj = self._resolve(object_name)
+        if not obj or obj.type != 'MESH':
+            raise ValueError(f"Mesh object not found: {object_name}")
         
-        if bpy.context.mode != 'EDIT_MESH':
-            bpy.ops.object.mode_set(mode='EDIT')
+        # Validate the whole batch before touching the mesh
+        steps = []
+        for op in ops:
+            params = dict(op)
+            op_name = params.pop("op", None)
+            edit = self._mesh_edit_ops.get(op_name)
+            if edit is None:
+                raise ValueError(f"Invalid mesh edit op: {op_name}")
+            self._check_mesh_edit_args(op_name, edit, params)
+            steps.append((edit, params))
         
-        bpy.ops.mesh.merge(type=merge_type)
-        bpy.ops.object.mode_set(mode='OBJECT')
+        self._bm_apply(obj, steps)
         
-        return {"object": object_name, "merge_type": merge_type}
+        return {"object": object_name, "ops": [op["op"] for op in ops]}
+
+    # Mesh edits run on a BMesh so no operator, mode switch or selection
+    # change is needed. Objects already in edit mode are edited in place and
+    # only their selection is affected; otherwise subdivide, bevel and inset
+    # apply to the whole mesh like the operators did after select_all.
+
+    @staticmethod
+    def _bm_edit(obj):
+        """Get a BMesh for the object's mesh, sharing the edit-mode mesh if active"""
+        if obj.mode == 'EDIT':
+            return bmesh.from_edit_mesh(obj.data)
+        bm = bmesh.new()
+        bm.from_mesh(obj.data)
+        return bm
+
+    @staticmethod
+    def _bm_finish(bm, obj):
+        """Write a BMesh obtained from _bm_edit back to the object's mesh"""
+        if obj.mode == 'EDIT':
+            bmesh.update_edit_mesh(obj.data)
+        else:
+            bm.to_mesh(obj.data)
+            bm.free()
+            obj.data.update()
+
+    def _bm_apply(self, obj, steps):
+        """Run (edit, params) steps on the object's mesh, keeping the result only if all succeed"""
+        bm = self._bm_edit(obj)
+        # The edit-mode BMesh is Blender's live mesh, keep a copy to roll back to
+        backup = bm.copy() if obj.mode == 'EDIT' else None
+        try:
+            for edit, params in steps:
+                edit(bm, obj, **params)
+        except Exception:
+            self._bm_discard(bm, obj, backup)
+            raise
+        if backup is not None:
+            backup.free()
+        self._bm_finish(bm, obj)
+
+    @staticmethod
+    def _bm_discard(bm, obj, backup=None):
+        """Drop the changes made to a BMesh from _bm_edit, restoring backup in edit mode"""
+        if obj.mode != 'EDIT':
+            bm.free()
+            return
+        # The edit-mode BMesh belongs to Blender and must not be freed, reload
+        # it from the backup through a scratch mesh instead
+        scratch = bpy.data.meshes.new("_blendermcp_rollback")
+        try:
+            backup.to_mesh(scratch)
+            bm.clear()
+            bm.from_mesh(scratch)
+        finally:
+            backup.free()
+            bpy.data.meshes.remove(scratch)
+        bmesh.update_edit_mesh(obj.data, loop_triangles=True, destructive=True)
+
+    @staticmethod
+    def _check_mesh_edit_args(op_name, edit, params):
+        """Check a mesh edit op's argument names and types against its defaults"""
+        try:
+            signature = inspect.signature(edit)
+            signature.bind(None, None, **params)
+        except TypeError as e:
+            raise ValueError(f"Invalid arguments for mesh edit op {op_name}: {e}")
+        for name, value in params.items():
+            default = signature.parameters[name].default
+            if isinstance(default, bool) or isinstance(value, bool):
+                valid = isinstance(value, bool) and isinstance(default, bool)
+            elif isinstance(default, int):
+                valid = isinstance(value, int)
+            elif isinstance(default, float):
+                valid = isinstance(value, (int, float))
+            elif isinstance(default, str):
+                valid = isinstance(value, str)
+            elif isinstance(default, tuple):
+                valid = (
+                    isinstance(value, (list, tuple))
+                    and len(value) == len(default)
+                    and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value)
+                )
+            else:
+                valid = True
+            if not valid:
+                raise ValueError(f"Invalid value for {name} in mesh edit op {op_name}: {value!r}")
+        if op_name == "merge" and params.get("merge_type", "CENTER") not in MERGE_TYPES:
+            raise ValueError(f"Invalid merge type: {params['merge_type']}")
+
+    @staticmethod
+    def _bm_targets(elements, obj):
+        """Selected elements in edit mode, every element otherwise"""
+        if obj.mode == 'EDIT':
+            return [e for e in elements if e.select]
+        return list(elements)
+
+    @staticmethod
+    def _bm_extrude(bm, obj, distance=1.0, direction=(0, 0, 1)):
+        geom = [v for v in bm.verts if v.select] + [e for e in bm.edges if e.select] + [f for f in bm.faces if f.select]
+        if not geom:
+            return
+        
+        # Like extrude_region_move: the original faces go away where the region borders
+        # other faces, an isolated region keeps them as the bottom cap
+        extruded = bmesh.ops.extrude_face_region(bm, geom=geom)["geom"]
+        
+        # The translation is given in world space, bmesh works in object space
+        offset = obj.matrix_world.inverted().to_3x3() @ (mathutils.Vector(direction) * distance)
+        new_verts = [e for e in extruded if isinstance(e, bmesh.types.BMVert)]
+        bmesh.ops.translate(bm, vec=offset, verts=new_verts)
+        
+        # Faces the extrusion replaced are freed
+        for elem in geom:
+            if elem.is_valid:
+                elem.select_set(False)
+        for elem in extruded:
+            elem.select_set(True)
+
+    def _bm_subdivide(self, bm, obj, cuts=1):
+        edges = self._bm_targets(bm.edges, obj)
+        bmesh.ops.subdivide_edges(bm, edges=edges, cuts=cuts, use_grid_fill=True)
+
+    def _bm_bevel(self, bm, obj, offset=0.1, segments=1):
+        edges = self._bm_targets(bm.edges, obj)
+        bmesh.ops.bevel(
+            bm,
+            geom=edges,
+            offset=offset,
+            segments=segments,
+            profile=0.5,
+            affect='EDGES',
+        )
+
+    def _bm_inset(self, bm, obj, thickness=0.1):
+        faces = self._bm_targets(bm.faces, obj)
+        bmesh.ops.inset_region(bm, faces=faces, thickness=thickness, use_even_offset=True)
+
+    @staticmethod
+    def _bm_merge(bm, obj, merge_type='CENTER'):
+        verts = [v for v in bm.verts if v.select]
+        if merge_type == 'COLLAPSE':
+            bmesh.ops.collapse(bm, edges=[e for e in bm.edges if e.select], uvs=True)
+            return
+        if len(verts) < 2:
+            return
+        
+        if merge_type == 'CENTER':
+            merge_co = sum((v.co for v in verts), mathutils.Vector()) / len(verts)
+        elif merge_type == 'CURSOR':
+            merge_co = obj.matrix_world.inverted() @ bpy.context.scene.cursor.location
+        elif merge_type in ('FIRST', 'LAST'):
+            history = [v for v in bm.select_history if isinstance(v, bmesh.types.BMVert)]
+            if not history:
+                raise ValueError(f"Merge type {merge_type} needs a vertex selection history")
+            merge_co = (history[0] if merge_type == 'FIRST' else history[-1]).co.copy()
+        else:
+            raise ValueError(f"Invalid merge type: {merge_type}")
+        
+        bmesh.ops.pointmerge(bm, verts=verts, merge_co=merge_co)
 
     # ===== MODIFIERS =====
     
@@ -704,9 +1499,7 @@ class BlenderMCPServer:
         Common types: SUBSURF, MIRROR, ARRAY, BEVEL, BOOLEAN, SOLIDIFY, DISPLACE, SHRINKWRAP
         Example: add_modifier(object_name="Cube", modifier_type="SUBSURF", levels=2)
         """
-        obj = bpy.data.objects.get(object_name)
-        if not obj:
-            raise ValueError(f"Object not found: {object_name}")
+        obj = self._require_object(object_name)
         
         mod = obj.modifiers.new(name=modifier_type, type=modifier_type)
         
@@ -718,9 +1511,7 @@ class BlenderMCPServer:
     
     def remove_modifier(self, object_name, modifier_name):
         """Remove a modifier from an object"""
-        obj = bpy.data.objects.get(object_name)
-        if not obj:
-            raise ValueError(f"Object not found: {object_name}")
+        obj = self._require_object(object_name)
         
         mod = obj.modifiers.get(modifier_name)
         if not mod:
@@ -731,26 +1522,19 @@ class BlenderMCPServer:
     
     def apply_modifier(self, object_name, modifier_name):
         """Apply a modifier to an object"""
-        obj = bpy.data.objects.get(object_name)
-        if not obj:
-            raise ValueError(f"Object not found: {object_name}")
+        obj = self._require_object(object_name)
         
         mod = obj.modifiers.get(modifier_name)
         if not mod:
             raise ValueError(f"Modifier not found: {modifier_name}")
         
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
-        
-        bpy.ops.object.modifier_apply(modifier=modifier_name)
+        with self._with_active(obj):
+            bpy.ops.object.modifier_apply(modifier=modifier_name)
         return {"object": object_name, "applied": modifier_name}
     
     def list_modifiers(self, object_name):
         """List all modifiers on an object"""
-        obj = bpy.data.objects.get(object_name)
-        if not obj:
-            raise ValueError(f"Object not found: {object_name}")
+        obj = self._require_object(object_name)
         
         modifiers = []
         for mod in obj.modifiers:
@@ -771,65 +1555,81 @@ class BlenderMCPServer:
         mat = bpy.data.materials.new(name=name)
         mat.use_nodes = True
         
-        nodes = mat.node_tree.nodes
-        principled = None
-        for node in nodes:
-            if node.type == 'BSDF_PRINCIPLED':
-                principled = node
-                break
-        
-        if principled:
-            principled.inputs['Base Color'].default_value = color
-            principled.inputs['Metallic'].default_value = metallic
-            principled.inputs['Roughness'].default_value = roughness
+        # The default node tree already holds a Principled BSDF under its default name;
+        # only build the tree ourselves if it is missing (e.g. translated node names)
+        node_tree = mat.node_tree
+        principled = node_tree.nodes.get('Principled BSDF')
+        if principled is None:
+            node_tree.nodes.clear()
+            output = node_tree.nodes.new(type='ShaderNodeOutputMaterial')
+            principled = node_tree.nodes.new(type='ShaderNodeBsdfPrincipled')
+            node_tree.links.new(principled.outputs[0], output.inputs[0])
+        
+        inputs = principled.inputs
+        inputs['Base Color'].default_value = color
+        inputs['Metallic'].default_value = metallic
+        inputs['Roughness'].default_value = roughness
         
         return {"material": mat.name, "color": color}
     
     def assign_material(self, object_name, material_name):
         """Assign a material to an object"""
-        obj = bpy.data.objects.get(object_name)
-        mat = bpy.data.materials.get(material_name)
-        
-        if not obj:
-            raise ValueError(f"Object not found: {object_name}")
-        if not mat:
-            raise ValueError(f"Material not found: {material_name}")
+        obj = self._require_object(object_name)
+        mat = self._require_material(material_name)
         
+        # Reassigning the same material still tags the object and recompiles its shaders
         if len(obj.data.materials) == 0:
             obj.data.materials.append(mat)
-        else:
+        elif obj.data.materials[0] != mat:
             obj.data.materials[0] = mat
         
         return {"object": object_name, "material": material_name}
     
     def set_material_color(self, material_name, color):
         """Set the base color of a material"""
-        mat = bpy.data.materials.get(material_name)
-        if not mat:
-            raise ValueError(f"Material not found: {material_name}")
+        mat = self._require_material(material_name)
         
         if mat.use_nodes:
-            for node in mat.node_tree.nodes:
-                if node.type == 'BSDF_PRINCIPLED':
-                    node.inputs['Base Color'].default_value = color
-                    break
+            principled = self._find_principled(mat)
+            if principled:
+                base_color = _principled_input(principled, 'Base Color')
+                # Stored as float32, so compare with matching precision before writing
+                current = base_color.default_value
+                if len(current) != len(color) or not np.allclose(current, color, rtol=0, atol=1e-6):
+                    base_color.default_value = color
         
         return {"material": material_name, "color": color}
     
+    def _find_principled(self, mat):
+        """Return the material's Principled BSDF node, remembering its name for later lookups"""
+        # Node references are not safe to keep across edits, the name is; a
+        # stale name simply misses and the nodes are scanned again
+        nodes = mat.node_tree.nodes
+        node = nodes.get(self._principled_cache.get(mat.name, ''))
+        if node is None or node.type != 'BSDF_PRINCIPLED':
+            node = next((n for n in nodes if n.type == 'BSDF_PRINCIPLED'), None)
+            if node is None:
+                self._principled_cache.pop(mat.name, None)
+                return None
+            self._principled_cache[mat.name] = node.name
+        return node
+    
     def set_smooth_shading(self, object_name, smooth=True):
         """Set smooth or flat shading for an object"""
-        obj = bpy.data.objects.get(object_name)
+        obj = self._resolve(object_name)
         if not obj or obj.type != 'MESH':
             raise ValueError(f"Mesh object not found: {object_name}")
         
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
-        
-        if smooth:
-            bpy.ops.object.shade_smooth()
+        if obj.mode == 'EDIT':
+            # Mesh data is rewritten from the edit mesh when leaving edit mode
+            bm = self._bm_edit(obj)
+            for face in bm.faces:
+                face.smooth = smooth
+            self._bm_finish(bm, obj)
         else:
-            bpy.ops.object.shade_flat()
+            mesh = obj.data
+            mesh.polygons.foreach_set("use_smooth", np.full(len(mesh.polygons), smooth, dtype=bool))
+            mesh.update()
         
         return {"object": object_name, "smooth": smooth}
 
@@ -840,9 +1640,7 @@ class BlenderMCPServer:
         Set a keyframe for an object property.
         data_path examples: 'location', 'rotation_euler', 'scale', 'hide_viewport'
         """
-        obj = bpy.data.objects.get(object_name)
-        if not obj:
-            raise ValueError(f"Object not found: {object_name}")
+        obj = self._require_object(object_name)
         
         if frame is not None:
             bpy.context.scene.frame_set(frame)
@@ -859,6 +1657,101 @@ class BlenderMCPServer:
             "frame": bpy.context.scene.frame_current
         }
     
+    def set_keyframes(self, keyframes):
+        """
+        Set many keyframes in one command. Each item takes the set_keyframe arguments.
+        Items with a value are written straight into the F-curves, the scene is only
+        evaluated for frames that have items keying the animated value.
+        Example: set_keyframes(keyframes=[{"object_name": "Cube", "data_path": "location", "frame": 1, "value": [0, 0, 0]}])
+        """
+        objects = {}
+        for item in keyframes:
+            name = item["object_name"]
+            if name not in objects:
+                objects[name] = self._require_object(name)
+        
+        # Keyframes without a frame go on the current frame, before any frame change
+        current = bpy.context.scene.frame_current
+        ordered = sorted(keyframes, key=lambda item: current if item.get("frame") is None else item["frame"])
+        
+        frames = []
+        valued = {}
+        unvalued = []
+        for item in ordered:
+            frame = item.get("frame")
+            if frame is None:
+                frame = current
+            if not frames or frames[-1] != frame:
+                frames.append(frame)
+            
+            obj = objects[item["object_name"]]
+            data_path = item["data_path"]
+            # Raises for properties the object does not have, like keyframe_insert would,
+            # before anything is keyed
+            obj.path_resolve(data_path)
+            value = item.get("value")
+            if value is not None:
+                valued.setdefault((obj.name, data_path), []).append((frame, value))
+            else:
+                unvalued.append((obj, data_path, frame))
+        
+        curves = [
+            (objects[name], data_path, *self._fcurve_keys(data_path, keys))
+            for (name, data_path), keys in valued.items()
+        ]
+        
+        for obj, data_path, frame in unvalued:
+            if frame != bpy.context.scene.frame_current:
+                # Keying the existing value needs the scene evaluated at that frame
+                bpy.context.scene.frame_set(frame)
+            obj.keyframe_insert(data_path=data_path, frame=frame)
+        
+        for obj, data_path, frame_array, values in curves:
+            self._key_fcurves(obj, data_path, frame_array, values)
+        # Keys written straight into F-curves don't touch the property, re-evaluate
+        # the animation so the objects show their keyed pose on this frame
+        for obj in {curve[0] for curve in curves}:
+            obj.update_tag(refresh={'TIME'})
+        
+        return {"count": len(ordered), "frames": frames}
+    
+    @staticmethod
+    def _fcurve_keys(data_path, keys):
+        """Turn (frame, value) pairs into a frame array and a frames x channels value array"""
+        # A later key on the same frame replaces an earlier one
+        by_frame = {}
+        for frame, value in keys:
+            by_frame[frame] = value if isinstance(value, (list, tuple)) else [value]
+        frame_array = np.fromiter(by_frame.keys(), dtype=np.float32, count=len(by_frame))
+        try:
+            values = np.array(list(by_frame.values()), dtype=np.float32)
+        except ValueError as e:
+            raise ValueError(f"Invalid keyframe values for {data_path}: {e}")
+        return frame_array, values
+    
+    @staticmethod
+    def _key_fcurves(obj, data_path, frame_array, values):
+        """
+        Key frames and values from _fcurve_keys directly on one property's F-curves.
+        Empty curves are filled with a single foreach_set, others get fast inserts.
+        """
+        anim_data = obj.animation_data or obj.animation_data_create()
+        if anim_data.action is None:
+            anim_data.action = bpy.data.actions.new(name=f"{obj.name}Action")
+        fcurves = anim_data.action.fcurves
+        
+        for index in range(values.shape[1]):
+            fcurve = fcurves.find(data_path, index=index) or fcurves.new(data_path, index=index)
+            points = fcurve.keyframe_points
+            if len(points) == 0:
+                points.add(len(frame_array))
+                points.foreach_set("co", np.column_stack((frame_array, values[:, index])).ravel())
+            else:
+                for frame, value in zip(frame_array, values[:, index]):
+                    points.insert(frame, value, options={'FAST'})
+            # Sorts the points and recomputes handles once for the whole curve
+            fcurve.update()
+    
     def set_frame(self, frame):
         """Set the current frame"""
         bpy.context.scene.frame_set(frame)
@@ -930,11 +1823,9 @@ class BlenderMCPServer:
     
     def link_to_collection(self, object_name, collection_name):
         """Link an object to a collection"""
-        obj = bpy.data.objects.get(object_name)
+        obj = self._require_object(object_name)
         collection = bpy.data.collections.get(collection_name)
         
-        if not obj:
-            raise ValueError(f"Object not found: {object_name}")
         if not collection:
             raise ValueError(f"Collection not found: {collection_name}")
         
@@ -949,15 +1840,15 @@ class BlenderMCPServer:
             if asset_type not in ["hdris", "textures", "models", "all"]:
                 return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
                 
-            response = requests.get(f"https://api.polyhaven.com/categories/{asset_type}")
-            if response.status_code == 200:
-                return {"categories": response.json()}
+            status_code, categories = _ph_get_json(f"https://api.polyhaven.com/categories/{asset_type}")
+            if status_code == 200:
+                return {"categories": categories}
             else:
-                return {"error": f"API request failed with status code {response.status_code}"}
+                return {"error": f"API request failed with status code {status_code}"}
         except Exception as e:
             return {"error": str(e)}
     
-    def search_polyhaven_assets(self, asset_type=None, categories=None):
+    def search_polyhaven_assets(self, asset_type=None, categories=None, limit=20):
         """Search for assets from Polyhaven with optional filtering"""
         try:
             url = "https://api.polyhaven.com/assets"
@@ -971,28 +1862,21 @@ class BlenderMCPServer:
             if categories:
                 params["categories"] = categories
                 
-            response = requests.get(url, params=params)
-            if response.status_code == 200:
-                assets = response.json()
-                limited_assets = {}
-                for i, (key, value) in enumerate(assets.items()):
-                    if i >= 20:
-                        break
-                    limited_assets[key] = value
+            status_code, assets = _ph_get_json(url, params)
+            if status_code == 200:
+                limited_assets = dict(itertools.islice(assets.items(), limit))
                 
                 return {"assets": limited_assets, "total_count": len(assets), "returned_count": len(limited_assets)}
             else:
-                return {"error": f"API request failed with status code {response.status_code}"}
+                return {"error": f"API request failed with status code {status_code}"}
         except Exception as e:
             return {"error": str(e)}
     
     def download_polyhaven_asset(self, asset_id, asset_type, resolution="1k", file_format=None):
         try:
-            files_response = requests.get(f"https://api.polyhaven.com/files/{asset_id}")
-            if files_response.status_code != 200:
-                return {"error": f"Failed to get asset files: {files_response.status_code}"}
-            
-            files_data = files_response.json()
+            status_code, files_data = _ph_get_json(f"https://api.polyhaven.com/files/{asset_id}")
+            if status_code != 200:
+                return {"error": f"Failed to get asset files: {status_code}"}
             
             if asset_type == "hdris":
                 if not file_format:
@@ -1000,15 +1884,11 @@ class BlenderMCPServer:
                 
                 if "hdri" in files_data and resolution in files_data["hdri"] and file_format in files_data["hdri"][resolution]:
                     file_info = files_data["hdri"][resolution][file_format]
-                    file_url = file_info["url"]
+                    hdri_path = os.path.join(_PH_CACHE_DIR, "hdris", f"{asset_id}_{resolution}.{file_format}")
                     
-                    with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as tmp_file:
-                        response = requests.get(file_url)
-                        if response.status_code != 200:
-                            return {"error": f"Failed to download HDRI: {response.status_code}"}
-                        
-                        tmp_file.write(response.content)
-                        tmp_path = tmp_file.name
+                    status_code = self._ph_fetch_cached(file_info, hdri_path)
+                    if status_code != 200:
+                        return {"error": f"Failed to download HDRI: {status_code}"}
                     
                     try:
                         if not bpy.data.worlds:
@@ -1029,7 +1909,7 @@ class BlenderMCPServer:
                         
                         env_tex = node_tree.nodes.new(type='ShaderNodeTexEnvironment')
                         env_tex.location = (-400, 0)
-                        env_tex.image = bpy.data.images.load(tmp_path)
+                        env_tex.image = bpy.data.images.load(hdri_path, check_existing=True)
                         
                         if file_format.lower() == 'exr':
                             try:
@@ -1057,11 +1937,6 @@ class BlenderMCPServer:
                         
                         bpy.context.scene.world = world
                         
-                        try:
-                            tempfile._cleanup()
-                        except:
-                            pass
-                        
                         return {
                             "success": True, 
                             "message": f"HDRI {asset_id} imported successfully",
@@ -1079,105 +1954,45 @@ class BlenderMCPServer:
                 downloaded_maps = {}
                 
                 try:
-                    for map_type in files_data:
-                        if map_type not in ["blend", "gltf"]:
-                            if resolution in files_data[map_type] and file_format in files_data[map_type][resolution]:
-                                file_info = files_data[map_type][resolution][file_format]
-                                file_url = file_info["url"]
-                                
-                                with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as tmp_file:
-                                    response = requests.get(file_url)
-                                    if response.status_code == 200:
-                                        tmp_file.write(response.content)
-                                        tmp_path = tmp_file.name
-                                        
-                                        image = bpy.data.images.load(tmp_path)
-                                        image.name = f"{asset_id}_{map_type}.{file_format}"
-                                        image.pack()
-                                        
-                                        if map_type in ['color', 'diffuse', 'albedo']:
-                                            try:
-                                                image.colorspace_settings.name = 'sRGB'
-                                            except:
-                                                pass
-                                        else:
-                                            try:
-                                                image.colorspace_settings.name = 'Non-Color'
-                                            except:
-                                                pass
-                                        
-                                        downloaded_maps[map_type] = image
-                                        
-                                        try:
-                                            os.unlink(tmp_path)
-                                        except:
-                                            pass
-                
-                    if not downloaded_maps:
-                        return {"error": f"No texture maps found for the requested resolution and format"}
-                    
-                    mat = bpy.data.materials.new(name=asset_id)
-                    mat.use_nodes = True
-                    nodes = mat.node_tree.nodes
-                    links = mat.node_tree.links
-                    
-                    for node in nodes:
-                        nodes.remove(node)
-                    
-                    output = nodes.new(type='ShaderNodeOutputMaterial')
-                    output.location = (300, 0)
+                    map_types = [
+                        map_type for map_type in files_data
+                        if map_type not in ["blend", "gltf"]
+                        and resolution in files_data[map_type] and file_format in files_data[map_type][resolution]
+                    ]
                     
-                    principled = nodes.new(type='ShaderNodeBsdfPrincipled')
-                    principled.location = (0, 0)
-                    links.new(principled.outputs[0], output.inputs[0])
+                    def fetch(map_type):
+                        map_path = os.path.join(_PH_CACHE_DIR, "textures", f"{asset_id}_{map_type}_{resolution}.{file_format}")
+                        if self._ph_fetch_cached(files_data[map_type][resolution][file_format], map_path) == 200:
+                            return map_path
+                        return None
                     
-                    tex_coord = nodes.new(type='ShaderNodeTexCoord')
-                    tex_coord.location = (-800, 0)
+                    # Download every map concurrently, bpy is only touched from this thread
+                    with concurrent.futures.ThreadPoolExecutor(max_workers=6) as pool:
+                        map_paths = list(pool.map(fetch, map_types))
                     
-                    mapping = nodes.new(type='ShaderNodeMapping')
-                    mapping.location = (-600, 0)
-                    mapping.vector_type = 'TEXTURE'
-                    links.new(tex_coord.outputs['UV'], mapping.inputs['Vector'])
-                    
-                    x_pos = -400
-                    y_pos = 300
-                    
-                    for map_type, image in downloaded_maps.items():
-                        tex_node = nodes.new(type='ShaderNodeTexImage')
-                        tex_node.location = (x_pos, y_pos)
-                        tex_node.image = image
-                        
-                        if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                            try:
-                                tex_node.image.colorspace_settings.name = 'sRGB'
-                            except:
-                                pass
-                        else:
-                            try:
-                                tex_node.image.colorspace_settings.name = 'Non-Color'
-                            except:
-                                pass
+                    for map_type, map_path in zip(map_types, map_paths):
+                        if map_path is None:
+                            continue
                         
-                        links.new(mapping.outputs['Vector'], tex_node.inputs['Vector'])
+                        image = bpy.data.images.load(map_path, check_existing=True)
+                        image.name = f"{asset_id}_{map_type}.{file_format}"
+                        image.pack()
+                        _set_colorspace(image, map_type.lower() in _COLOR_MAPS)
                         
-                        if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                            links.new(tex_node.outputs['Color'], principled.inputs['Base Color'])
-                        elif map_type.lower() in ['roughness', 'rough']:
-                            links.new(tex_node.outputs['Color'], principled.inputs['Roughness'])
-                        elif map_type.lower() in ['metallic', 'metalness', 'metal']:
-                            links.new(tex_node.outputs['Color'], principled.inputs['Metallic'])
-                        elif map_type.lower() in ['normal', 'nor']:
-                            normal_map = nodes.new(type='ShaderNodeNormalMap')
-                            normal_map.location = (x_pos + 200, y_pos)
-                            links.new(tex_node.outputs['Color'], normal_map.inputs['Color'])
-                            links.new(normal_map.outputs['Normal'], principled.inputs['Normal'])
-                        elif map_type in ['displacement', 'disp', 'height']:
-                            disp_node = nodes.new(type='ShaderNodeDisplacement')
-                            disp_node.location = (x_pos + 200, y_pos - 200)
-                            links.new(tex_node.outputs['Color'], disp_node.inputs['Height'])
-                            links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
+                        downloaded_maps[map_type] = image
                         
-                        y_pos -= 250
+                        image_names = _PH_TEXTURE_INDEX.setdefault(asset_id, [])
+                        if image.name not in image_names:
+                            image_names.append(image.name)
+                
+                    if not downloaded_maps:
+                        return {"error": f"No texture maps found for the requested resolution and format"}
+                    
+                    # Materials applied from an earlier download of this texture are out of date
+                    for key in [key for key in self._set_texture_cache if key[1] == asset_id]:
+                        del self._set_texture_cache[key]
+                    
+                    mat = _build_principled_material(asset_id, downloaded_maps)
                     
                     return {
                         "success": True, 
@@ -1197,32 +2012,28 @@ class BlenderMCPServer:
                     file_info = files_data[file_format][resolution][file_format]
                     file_url = file_info["url"]
                     
-                    temp_dir = tempfile.mkdtemp()
-                    main_file_path = ""
+                    # Included files are referenced relative to the model, so each model gets its own directory
+                    model_dir = os.path.join(_PH_CACHE_DIR, "models", f"{asset_id}_{resolution}_{file_format}")
                     
                     try:
                         main_file_name = file_url.split("/")[-1]
-                        main_file_path = os.path.join(temp_dir, main_file_name)
+                        main_file_path = os.path.join(model_dir, main_file_name)
                         
-                        response = requests.get(file_url)
-                        if response.status_code != 200:
-                            return {"error": f"Failed to download model: {response.status_code}"}
+                        # The model and its included files go to distinct paths, fetch them all at once
+                        with concurrent.futures.ThreadPoolExecutor(max_workers=6) as pool:
+                            main_download = pool.submit(self._ph_fetch_cached, file_info, main_file_path)
+                            include_downloads = [
+                                (include_path, pool.submit(self._ph_fetch_cached, include_info, os.path.join(model_dir, include_path)))
+                                for include_path, include_info in (file_info.get("include") or {}).items()
+                            ]
                         
-                        with open(main_file_path, "wb") as f:
-                            f.write(response.content)
+                        status_code = main_download.result()
+                        if status_code != 200:
+                            return {"error": f"Failed to download model: {status_code}"}
                         
-                        if "include" in file_info and file_info["include"]:
-                            for include_path, include_info in file_info["include"].items():
-                                include_url = include_info["url"]
-                                include_file_path = os.path.join(temp_dir, include_path)
-                                os.makedirs(os.path.dirname(include_file_path), exist_ok=True)
-                                
-                                include_response = requests.get(include_url)
-                                if include_response.status_code == 200:
-                                    with open(include_file_path, "wb") as f:
-                                        f.write(include_response.content)
-                                else:
-                                    print(f"Failed to download included file: {include_path}")
+                        for include_path, include_download in include_downloads:
+                            if include_download.result() != 200:
+                                print(f"Failed to download included file: {include_path}")
                         
                         if file_format == "gltf" or file_format == "glb":
                             bpy.ops.import_scene.gltf(filepath=main_file_path)
@@ -1249,11 +2060,6 @@ class BlenderMCPServer:
                         }
                     except Exception as e:
                         return {"error": f"Failed to import model: {str(e)}"}
-                    finally:
-                        try:
-                            shutil.rmtree(temp_dir)
-                        except:
-                            print(f"Failed to clean up temporary directory: {temp_dir}")
                 else:
                     return {"error": f"Requested format or resolution not available for this model"}
                 
@@ -1263,33 +2069,70 @@ class BlenderMCPServer:
         except Exception as e:
             return {"error": f"Failed to download asset: {str(e)}"}
 
-    def set_texture(self, object_name, texture_id):
-        """Apply a previously downloaded Polyhaven texture to an object by creating a new material"""
+    @staticmethod
+    def _ph_download(url, path, md5=None):
+        """Stream a Polyhaven file to path in chunks, returns the HTTP status code"""
+        with _PH_SESSION.get(url, stream=True, timeout=POLYHAVEN_DOWNLOAD_TIMEOUT) as response:
+            if response.status_code == 200:
+                digest = hashlib.md5()
+                with open(path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        digest.update(chunk)
+                if md5 and digest.hexdigest() != md5:
+                    os.unlink(path)
+                    raise ValueError(f"Checksum mismatch for {url}")
+            return response.status_code
+
+    @classmethod
+    def _ph_fetch_cached(cls, file_info, cache_path):
+        """Download a Polyhaven file into the cache unless a complete copy is there, returns the HTTP status code"""
+        if os.path.isfile(cache_path) and os.path.getsize(cache_path) == file_info.get("size", -1):
+            return 200
+        
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # Download next to the final path so a partial file is never mistaken for a cached one
+        part_path = cache_path + ".part"
+        status_code = cls._ph_download(file_info["url"], part_path, file_info.get("md5"))
+        if status_code == 200:
+            os.replace(part_path, cache_path)
+        return status_code
+
+    def set_texture(self, object_name, texture_id, detail="full"):
+        """Apply a previously downloaded Polyhaven texture to an object by creating a new material
+        
+        With detail="basic" the material summary skips the node tree walk.
+        """
         try:
-            obj = bpy.data.objects.get(object_name)
+            obj = self._resolve(object_name)
             if not obj:
                 return {"error": f"Object not found: {object_name}"}
             
             if not hasattr(obj, 'data') or not hasattr(obj.data, 'materials'):
                 return {"error": f"Object {object_name} cannot accept materials"}
             
+            # Applying the same texture again changes nothing while the object still uses the material
+            cache_key = (object_name, texture_id, detail)
+            cached = self._set_texture_cache.get(cache_key)
+            if cached is not None:
+                active_material = obj.active_material
+                if active_material is not None and active_material.name == cached["material"]:
+                    return cached
+                del self._set_texture_cache[cache_key]
+            
+            # Images may have been renamed or removed since the download, or come
+            # from an earlier session, in which case all images are scanned
+            images = [bpy.data.images.get(image_name) for image_name in _PH_TEXTURE_INDEX.get(texture_id, ())]
+            if not images or None in images:
+                images = bpy.data.images
+            
             texture_images = {}
-            for img in bpy.data.images:
+            for img in images:
                 if img.name.startswith(texture_id + "_"):
                     map_type = img.name.split('_')[-1].split('.')[0]
-                    img.reload()
-                    
-                    if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                        try:
-                            img.colorspace_settings.name = 'sRGB'
-                        except:
-                            pass
-                    else:
-                        try:
-                            img.colorspace_settings.name = 'Non-Color'
-                        except:
-                            pass
+                    _set_colorspace(img, map_type.lower() in _COLOR_MAPS)
                     
+                    # Packing reads the file from disk, images that are already packed need nothing
                     if not img.packed_file:
                         img.pack()
                     
@@ -1299,168 +2142,72 @@ class BlenderMCPServer:
                 return {"error": f"No texture images found for: {texture_id}. Please download the texture first."}
             
             new_mat_name = f"{texture_id}_material_{object_name}"
-            existing_mat = bpy.data.materials.get(new_mat_name)
-            if existing_mat:
-                bpy.data.materials.remove(existing_mat)
-            
-            new_mat = bpy.data.materials.new(name=new_mat_name)
-            new_mat.use_nodes = True
-            
-            nodes = new_mat.node_tree.nodes
-            links = new_mat.node_tree.links
-            nodes.clear()
-            
-            output = nodes.new(type='ShaderNodeOutputMaterial')
-            output.location = (600, 0)
-            
-            principled = nodes.new(type='ShaderNodeBsdfPrincipled')
-            principled.location = (300, 0)
-            links.new(principled.outputs[0], output.inputs[0])
-            
-            tex_coord = nodes.new(type='ShaderNodeTexCoord')
-            tex_coord.location = (-800, 0)
-            
-            mapping = nodes.new(type='ShaderNodeMapping')
-            mapping.location = (-600, 0)
-            mapping.vector_type = 'TEXTURE'
-            links.new(tex_coord.outputs['UV'], mapping.inputs['Vector'])
-            
-            x_pos = -400
-            y_pos = 300
-            
-            texture_nodes = {}
-            for map_type, image in texture_images.items():
-                tex_node = nodes.new(type='ShaderNodeTexImage')
-                tex_node.location = (x_pos, y_pos)
-                tex_node.image = image
-                
-                if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                    try:
-                        tex_node.image.colorspace_settings.name = 'sRGB'
-                    except:
-                        pass
-                else:
-                    try:
-                        tex_node.image.colorspace_settings.name = 'Non-Color'
-                    except:
-                        pass
-                
-                links.new(mapping.outputs['Vector'], tex_node.inputs['Vector'])
-                texture_nodes[map_type] = tex_node
-                y_pos -= 250
-            
-            # Connect texture nodes
-            for map_name in ['color', 'diffuse', 'albedo']:
-                if map_name in texture_nodes:
-                    links.new(texture_nodes[map_name].outputs['Color'], principled.inputs['Base Color'])
-                    break
-            
-            for map_name in ['roughness', 'rough']:
-                if map_name in texture_nodes:
-                    links.new(texture_nodes[map_name].outputs['Color'], principled.inputs['Roughness'])
-                    break
-            
-            for map_name in ['metallic', 'metalness', 'metal']:
-                if map_name in texture_nodes:
-                    links.new(texture_nodes[map_name].outputs['Color'], principled.inputs['Metallic'])
-                    break
-            
-            for map_name in ['gl', 'dx', 'nor']:
-                if map_name in texture_nodes:
-                    normal_map_node = nodes.new(type='ShaderNodeNormalMap')
-                    normal_map_node.location = (100, 100)
-                    links.new(texture_nodes[map_name].outputs['Color'], normal_map_node.inputs['Color'])
-                    links.new(normal_map_node.outputs['Normal'], principled.inputs['Normal'])
-                    break
-            
-            for map_name in ['displacement', 'disp', 'height']:
-                if map_name in texture_nodes:
-                    disp_node = nodes.new(type='ShaderNodeDisplacement')
-                    disp_node.location = (300, -200)
-                    disp_node.inputs['Scale'].default_value = 0.1
-                    links.new(texture_nodes[map_name].outputs['Color'], disp_node.inputs['Height'])
-                    links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
-                    break
-            
-            if 'arm' in texture_nodes:
-                separate_rgb = nodes.new(type='ShaderNodeSeparateRGB')
-                separate_rgb.location = (-200, -100)
-                links.new(texture_nodes['arm'].outputs['Color'], separate_rgb.inputs['Image'])
-                
-                if not any(map_name in texture_nodes for map_name in ['roughness', 'rough']):
-                    links.new(separate_rgb.outputs['G'], principled.inputs['Roughness'])
-                
-                if not any(map_name in texture_nodes for map_name in ['metallic', 'metalness', 'metal']):
-                    links.new(separate_rgb.outputs['B'], principled.inputs['Metallic'])
-                
-                base_color_node = None
-                for map_name in ['color', 'diffuse', 'albedo']:
-                    if map_name in texture_nodes:
-                        base_color_node = texture_nodes[map_name]
-                        break
-                
-                if base_color_node:
-                    mix_node = nodes.new(type='ShaderNodeMixRGB')
-                    mix_node.location = (100, 200)
-                    mix_node.blend_type = 'MULTIPLY'
-                    mix_node.inputs['Fac'].default_value = 0.8
-                    
-                    for link in base_color_node.outputs['Color'].links:
-                        if link.to_socket == principled.inputs['Base Color']:
-                            links.remove(link)
-                    
-                    links.new(base_color_node.outputs['Color'], mix_node.inputs[1])
-                    links.new(texture_nodes['ao'].outputs['Color'], mix_node.inputs[2])
-                    links.new(mix_node.outputs['Color'], principled.inputs['Base Color'])
+            new_mat = bpy.data.materials.get(new_mat_name)
+            # A material built from the same images already has the right node tree, reusing it
+            # avoids new nodes and another shader compile
+            if new_mat and not _material_uses_images(new_mat, texture_images.values()):
+                bpy.data.materials.remove(new_mat)
+                new_mat = None
+            if not new_mat:
+                new_mat = _build_principled_material(new_mat_name, texture_images)
             
             # Clear existing materials and assign new one
-            while len(obj.data.materials) > 0:
-                obj.data.materials.pop(index=0)
+            obj.data.materials.clear()
             
             obj.data.materials.append(new_mat)
             
             bpy.context.view_layer.objects.active = obj
             obj.select_set(True)
-            bpy.context.view_layer.update()
             
             texture_maps = list(texture_images.keys())
             
+            # Each attribute read below is an RNA lookup, so every value is fetched once
+            nodes = new_mat.node_tree.nodes
             material_info = {
                 "name": new_mat.name,
                 "has_nodes": new_mat.use_nodes,
-                "node_count": len(new_mat.node_tree.nodes),
-                "texture_nodes": []
+                "node_count": len(nodes),
             }
-            
-            for node in new_mat.node_tree.nodes:
-                if node.type == 'TEX_IMAGE' and node.image:
-                    connections = []
-                    for output in node.outputs:
-                        for link in output.links:
-                            connections.append(f"{output.name} → {link.to_node.name}.{link.to_socket.name}")
-                    
-                    material_info["texture_nodes"].append({
+            if detail != "basic":
+                material_info["texture_nodes"] = [
+                    {
                         "name": node.name,
-                        "image": node.image.name,
-                        "colorspace": node.image.colorspace_settings.name,
-                        "connections": connections
-                    })
+                        "image": image.name,
+                        "colorspace": image.colorspace_settings.name,
+                        "connections": [
+                            f"{output.name} → {link.to_node.name}.{link.to_socket.name}"
+                            for output in node.outputs
+                            for link in output.links
+                        ],
+                    }
+                    for node in nodes if node.type == 'TEX_IMAGE'
+                    for image in (node.image,) if image
+                ]
             
-            return {
+            result = {
                 "success": True,
                 "message": f"Created new material and applied texture {texture_id} to {object_name}",
                 "material": new_mat.name,
                 "maps": texture_maps,
                 "material_info": material_info
             }
+            self._set_texture_cache[cache_key] = result
+            return result
             
         except Exception as e:
             print(f"Error in set_texture: {str(e)}")
-            traceback.print_exc()
+            if self._debug:
+                traceback.print_exc()
             return {"error": f"Failed to apply texture: {str(e)}"}
 
     def get_polyhaven_status(self):
         """Get the current status of PolyHaven integration"""
+        status = self._status_cache["polyhaven"]
+        if status is None:
+            status = self._status_cache["polyhaven"] = self._polyhaven_status()
+        return status
+
+    def _polyhaven_status(self):
         enabled = bpy.context.scene.blendermcp_use_polyhaven
         if enabled:
             return {"enabled": True, "message": "PolyHaven integration is enabled and ready to use."}
@@ -1475,11 +2222,38 @@ class BlenderMCPServer:
 
     # ===== HYPER3D INTEGRATION (COMPLETE ORIGINAL) =====
     
+    @staticmethod
+    def _hyper3d_config(scene):
+        """Snapshot the Hyper3D scene settings used by one command"""
+        return {
+            "mode": scene.blendermcp_hyper3d_mode,
+            "key": scene.blendermcp_hyper3d_api_key,
+        }
+
+    def _require_hyper3d_ready(self, cfg):
+        """Reject a missing or malformed API key or an unknown mode before any request is sent"""
+        if cfg["mode"] not in self._rodin_poll:
+            raise ValueError(f"Unknown Hyper3D Rodin mode: {cfg['mode']}")
+        key = cfg["key"]
+        if not key:
+            raise ValueError("Hyper3D Rodin API key is not set, fill it in the BlenderMCP panel")
+        # Whitespace or control characters can't be valid and would break the Authorization header
+        if not key.isprintable() or any(c.isspace() for c in key):
+            raise ValueError("Hyper3D Rodin API key is invalid")
+
     def get_hyper3d_status(self):
         """Get the current status of Hyper3D Rodin integration"""
-        enabled = bpy.context.scene.blendermcp_use_hyper3d
+        status = self._status_cache["hyper3d"]
+        if status is None:
+            status = self._status_cache["hyper3d"] = self._hyper3d_status()
+        return status
+
+    def _hyper3d_status(self):
+        scene = bpy.context.scene
+        enabled = scene.blendermcp_use_hyper3d
         if enabled:
-            if not bpy.context.scene.blendermcp_hyper3d_api_key:
+            cfg = self._hyper3d_config(scene)
+            if not cfg["key"]:
                 return {
                     "enabled": False, 
                     "message": """Hyper3D Rodin integration is currently enabled, but API key is not given. To enable it:
@@ -1488,9 +2262,9 @@ class BlenderMCPServer:
                                 3. Choose the right plaform and fill in the API Key
                                 4. Restart the connection to Claude"""
                 }
-            mode = bpy.context.scene.blendermcp_hyper3d_mode
+            mode = cfg["mode"]
             message = f"Hyper3D Rodin integration is enabled and ready to use. Mode: {mode}. " + \
-                f"Key type: {'private' if bpy.context.scene.blendermcp_hyper3d_api_key != RODIN_FREE_TRIAL_KEY else 'free_trial'}"
+                f"Key type: {'private' if cfg['key'] != RODIN_FREE_TRIAL_KEY else 'free_trial'}"
             return {
                 "enabled": True,
                 "message": message
@@ -1504,47 +2278,44 @@ class BlenderMCPServer:
                             3. Restart the connection to Claude"""
             }
 
-    def create_rodin_job(self, *args, **kwargs):
-        match bpy.context.scene.blendermcp_hyper3d_mode:
-            case "MAIN_SITE":
-                return self.create_rodin_job_main_site(*args, **kwargs)
-            case "FAL_AI":
-                return self.create_rodin_job_fal_ai(*args, **kwargs)
-            case _:
-                return f"Error: Unknown Hyper3D Rodin mode!"
+    def create_rodin_job(self, cfg, *args, **kwargs):
+        self._require_hyper3d_ready(cfg)
+        create = self._rodin_create[cfg["mode"]]
+        return self._defer(functools.partial(create, cfg, *args, **kwargs))
 
     def create_rodin_job_main_site(
             self,
+            cfg,
             text_prompt: str=None,
             images: list=None,
             bbox_condition=None
         ):
         try:
-            if images is None:
-                images = []
-            files = [
-                *[("images", (f"{i:04d}{img_suffix}", img)) for i, (img_suffix, img) in enumerate(images)],
-                ("tier", (None, "Sketch")),
-                ("mesh_mode", (None, "Raw")),
-            ]
+            files = []
+            if images:
+                files.extend(("images", (f"{i:04d}{img_suffix}", img)) for i, (img_suffix, img) in enumerate(images))
+            files.append(_RODIN_TIER_FIELD)
+            files.append(_RODIN_MESH_MODE_FIELD)
             if text_prompt:
                 files.append(("prompt", (None, text_prompt)))
             if bbox_condition:
-                files.append(("bbox_condition", (None, json.dumps(bbox_condition))))
-            response = requests.post(
+                files.append(("bbox_condition", (None, _dumps(bbox_condition))))
+            response = _HTTP.post(
                 "https://hyperhuman.deemos.com/api/v2/rodin",
                 headers={
-                    "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
+                    "Authorization": f"Bearer {cfg['key']}",
                 },
-                files=files
+                files=files,
+                timeout=HYPER3D_TIMEOUT,
             )
-            data = response.json()
+            data = _hyper3d_json(response)
             return data
         except Exception as e:
             return {"error": str(e)}
     
     def create_rodin_job_fal_ai(
             self,
+            cfg,
             text_prompt: str=None,
             images: list=None,
             bbox_condition=None
@@ -1559,61 +2330,188 @@ class BlenderMCPServer:
                 req_data["prompt"] = text_prompt
             if bbox_condition:
                 req_data["bbox_condition"] = bbox_condition
-            response = requests.post(
+            response = _HTTP.post(
                 "https://queue.fal.run/fal-ai/hyper3d/rodin",
                 headers={
-                    "Authorization": f"Key {bpy.context.scene.blendermcp_hyper3d_api_key}",
+                    "Authorization": f"Key {cfg['key']}",
                     "Content-Type": "application/json",
                 },
-                json=req_data
+                json=req_data,
+                timeout=HYPER3D_TIMEOUT,
             )
-            data = response.json()
+            data = _hyper3d_json(response)
             return data
         except Exception as e:
             return {"error": str(e)}
 
-    def poll_rodin_job_status(self, *args, **kwargs):
-        match bpy.context.scene.blendermcp_hyper3d_mode:
-            case "MAIN_SITE":
-                return self.poll_rodin_job_status_main_site(*args, **kwargs)
-            case "FAL_AI":
-                return self.poll_rodin_job_status_fal_ai(*args, **kwargs)
-            case _:
-                return f"Error: Unknown Hyper3D Rodin mode!"
+    def poll_rodin_job_status(self, cfg, *args, **kwargs):
+        self._require_hyper3d_ready(cfg)
+        poll = self._rodin_poll[cfg["mode"]]
+        return self._defer(functools.partial(poll, cfg, *args, **kwargs))
 
-    def poll_rodin_job_status_main_site(self, subscription_key: str):
+    def poll_rodin_job_status_main_site(self, cfg, subscription_key: str):
         """Call the job status API to get the job status"""
-        response = requests.post(
+        response = _HTTP.post(
             "https://hyperhuman.deemos.com/api/v2/status",
             headers={
-                "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
+                "Authorization": f"Bearer {cfg['key']}",
             },
             json={
                 "subscription_key": subscription_key,
             },
+            timeout=HYPER3D_TIMEOUT,
         )
-        data = response.json()
+        data = _hyper3d_json(response)
         return {
             "status_list": [i["status"] for i in data["jobs"]]
         }
     
-    def poll_rodin_job_status_fal_ai(self, request_id: str):
+    def poll_rodin_job_status_fal_ai(self, cfg, request_id: str):
         """Call the job status API to get the job status"""
-        response = requests.get(
+        response = _HTTP.get(
             f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}/status",
             headers={
-                "Authorization": f"KEY {bpy.context.scene.blendermcp_hyper3d_api_key}",
+                "Authorization": f"KEY {cfg['key']}",
             },
+            timeout=HYPER3D_TIMEOUT,
         )
-        data = response.json()
+        data = _hyper3d_json(response)
         return data
 
+    def poll_rodin_jobs_batch(self, cfg, keys: list):
+        """Poll several jobs at once, keyed by subscription key (MAIN_SITE) or request id (FAL_AI)"""
+        self._require_hyper3d_ready(cfg)
+        poll = self._rodin_poll[cfg["mode"]]
+        
+        def poll_one(key):
+            # One failed job must not lose the statuses of the others
+            try:
+                return poll(cfg, key)
+            except Exception as e:
+                return {"error": str(e)}
+        
+        def poll_all():
+            if not keys:
+                return {}
+            # The requests overlap on the pooled session instead of running back to back
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(keys))) as pool:
+                results = pool.map(poll_one, keys)
+                return dict(zip(keys, results))
+        
+        return self._defer(poll_all)
+
+    def wait_for_rodin_job(self, cfg, subscription_key: str=None, request_id: str=None, timeout: float=RODIN_WAIT_TIMEOUT):
+        """Poll the job status with capped exponential backoff until it settles or the timeout expires"""
+        self._require_hyper3d_ready(cfg)
+        poll, is_settled, _ = self._rodin_job_checks(cfg, subscription_key, request_id)
+        return self._watch_rodin_job(poll, is_settled, timeout)
+
+    def wait_and_import_rodin_job(
+            self,
+            cfg,
+            name: str,
+            subscription_key: str=None,
+            task_uuid: str=None,
+            request_id: str=None,
+            timeout: float=RODIN_WAIT_TIMEOUT,
+        ):
+        """Wait for a job like wait_for_rodin_job, then import its asset like import_generated_asset, in one command"""
+        self._require_hyper3d_ready(cfg)
+        if cfg["mode"] == "MAIN_SITE" and not task_uuid:
+            raise ValueError("task_uuid is required to import a MAIN_SITE job")
+        poll, is_settled, succeeded = self._rodin_job_checks(cfg, subscription_key, request_id)
+        import_asset = self._rodin_import[cfg["mode"]]
+        
+        def import_when_done(status):
+            if status["timed_out"] or not succeeded(status):
+                return {"succeed": False, "error": "Generation did not complete", **status}
+            return import_asset(cfg, task_uuid or request_id, name)
+        
+        return self._watch_rodin_job(poll, is_settled, timeout, then=import_when_done)
+
+    def _rodin_job_checks(self, cfg, subscription_key, request_id):
+        """Return poll(), is_settled(status) and succeeded(status) for one job in the configured mode"""
+        match cfg["mode"]:
+            case "MAIN_SITE":
+                if not subscription_key:
+                    raise ValueError("subscription_key is required to wait for a MAIN_SITE job")
+                return (
+                    functools.partial(self.poll_rodin_job_status_main_site, cfg, subscription_key),
+                    lambda status: all(s in ("Done", "Failed") for s in status["status_list"]),
+                    lambda status: all(s == "Done" for s in status["status_list"]),
+                )
+            case "FAL_AI":
+                if not request_id:
+                    raise ValueError("request_id is required to wait for a FAL_AI job")
+                return (
+                    functools.partial(self.poll_rodin_job_status_fal_ai, cfg, request_id),
+                    lambda status: status.get("status") not in ("IN_QUEUE", "IN_PROGRESS"),
+                    lambda status: status.get("status") == "COMPLETED",
+                )
+
+    def _watch_rodin_job(self, poll, is_settled, timeout, then=None):
+        """Drive a Rodin job from a main-thread timer: poll, back off, repeat until settled
+        
+        Each poll runs on the I/O pool; between polls the timer sleeps 0.5s
+        doubling up to 15s, so no thread is held while the job runs. Resolves
+        with the last status plus "timed_out", or with then(status) when given,
+        which may itself return a Future (e.g. the asset import).
+        """
+        reply = concurrent.futures.Future()
+        deadline = time.monotonic() + min(timeout, RODIN_WAIT_TIMEOUT)
+        delay = RODIN_POLL_INITIAL_DELAY
+        task = None
+        
+        def finish(result):
+            if isinstance(result, concurrent.futures.Future):
+                result.add_done_callback(lambda _: finish(result.exception() or result.result()))
+            elif isinstance(result, Exception):
+                reply.set_exception(result)
+            else:
+                reply.set_result(result)
+        
+        def tick():
+            nonlocal delay, task
+            if not self.running:
+                finish(RuntimeError("Server stopped"))
+                return None
+            if task is None:
+                task = self._io_pool.submit(poll)
+                return IO_CHECK_INTERVAL
+            if not task.done():
+                return IO_CHECK_INTERVAL
+            
+            try:
+                status = task.result()
+            except Exception as e:
+                finish(e)
+                return None
+            task = None
+            
+            settled = is_settled(status)
+            remaining = deadline - time.monotonic()
+            if settled or remaining <= 0:
+                status = {**status, "timed_out": not settled}
+                try:
+                    finish(then(status) if then else status)
+                except Exception as e:
+                    finish(e)
+                return None
+            
+            next_poll = min(delay, remaining)
+            delay = min(RODIN_POLL_MAX_DELAY, delay * 2)
+            return next_poll
+        
+        bpy.app.timers.register(tick, first_interval=0, persistent=True)
+        return reply
+
     @staticmethod
     def _clean_imported_glb(filepath, mesh_name=None):
-        existing_objects = set(bpy.data.objects)
+        # Diff by name so only the imported objects get Python wrappers, not every object in the file
+        existing_names = set(bpy.data.objects.keys())
         bpy.ops.import_scene.gltf(filepath=filepath)
-        bpy.context.view_layer.update()
-        imported_objects = list(set(bpy.data.objects) - existing_objects)
+        objects = bpy.data.objects
+        imported_objects = [objects[name] for name in objects.keys() if name not in existing_names]
         
         if not imported_objects:
             print("Error: No objects were imported.")
@@ -1660,113 +2558,84 @@ class BlenderMCPServer:
 
         return mesh_obj
 
-    def import_generated_asset(self, *args, **kwargs):
-        match bpy.context.scene.blendermcp_hyper3d_mode:
-            case "MAIN_SITE":
-                return self.import_generated_asset_main_site(*args, **kwargs)
-            case "FAL_AI":
-                return self.import_generated_asset_fal_ai(*args, **kwargs)
-            case _:
-                return f"Error: Unknown Hyper3D Rodin mode!"
+    def import_generated_asset(self, cfg, *args, **kwargs):
+        self._require_hyper3d_ready(cfg)
+        import_asset = self._rodin_import[cfg["mode"]]
+        return import_asset(cfg, *args, **kwargs)
 
-    def import_generated_asset_main_site(self, task_uuid: str, name: str):
+    def import_generated_asset_main_site(self, cfg, task_uuid: str, name: str):
         """Fetch the generated asset, import into blender"""
-        response = requests.post(
-            "https://hyperhuman.deemos.com/api/v2/download",
-            headers={
-                "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
-            },
-            json={
-                'task_uuid': task_uuid
-            }
-        )
-        data_ = response.json()
-        temp_file = None
-        for i in data_["list"]:
-            if i["name"].endswith(".glb"):
-                temp_file = tempfile.NamedTemporaryFile(
-                    delete=False,
-                    prefix=task_uuid,
-                    suffix=".glb",
-                )
-    
-                try:
-                    response = requests.get(i["url"], stream=True)
-                    response.raise_for_status()
-                    
-                    for chunk in response.iter_content(chunk_size=8192):
-                        temp_file.write(chunk)
-                        
-                    temp_file.close()
-                    
-                except Exception as e:
-                    temp_file.close()
-                    os.unlink(temp_file.name)
-                    return {"succeed": False, "error": str(e)}
-                
-                break
-        else:
-            return {"succeed": False, "error": "Generation failed. Please first make sure that all jobs of the task are done and then try again later."}
-
-        try:
-            obj = self._clean_imported_glb(
-                filepath=temp_file.name,
-                mesh_name=name
+        def download():
+            response = _HTTP.post(
+                "https://hyperhuman.deemos.com/api/v2/download",
+                headers={
+                    "Authorization": f"Bearer {cfg['key']}",
+                },
+                json={
+                    'task_uuid': task_uuid
+                },
+                timeout=HYPER3D_TIMEOUT,
             )
-            result = {
-                "name": obj.name,
-                "type": obj.type,
-                "location": [obj.location.x, obj.location.y, obj.location.z],
-                "rotation": [obj.rotation_euler.x, obj.rotation_euler.y, obj.rotation_euler.z],
-                "scale": [obj.scale.x, obj.scale.y, obj.scale.z],
-            }
-
-            if obj.type == "MESH":
-                bounding_box = self._get_aabb(obj)
-                result["world_bounding_box"] = bounding_box
-            
-            return {
-                "succeed": True, **result
-            }
-        except Exception as e:
-            return {"succeed": False, "error": str(e)}
+            data_ = _hyper3d_json(response)
+            for i in data_["list"]:
+                if i["name"].endswith(".glb"):
+                    return self._download_glb(i["url"], prefix=task_uuid)
+            raise ValueError("Generation failed. Please first make sure that all jobs of the task are done and then try again later.")
+        
+        return self._defer(download, finish=functools.partial(self._import_glb, name=name))
     
-    def import_generated_asset_fal_ai(self, request_id: str, name: str):
+    def import_generated_asset_fal_ai(self, cfg, request_id: str, name: str):
         """Fetch the generated asset, import into blender"""
-        response = requests.get(
-            f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}",
-            headers={
-                "Authorization": f"Key {bpy.context.scene.blendermcp_hyper3d_api_key}",
-            }
-        )
-        data_ = response.json()
-        temp_file = None
+        def download():
+            response = _HTTP.get(
+                f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}",
+                headers={
+                    "Authorization": f"Key {cfg['key']}",
+                },
+                timeout=HYPER3D_TIMEOUT,
+            )
+            data_ = _hyper3d_json(response)
+            return self._download_glb(data_["model_mesh"]["url"], prefix=request_id)
         
+        return self._defer(download, finish=functools.partial(self._import_glb, name=name))
+
+    @staticmethod
+    def _download_glb(url, prefix):
+        """Download a GLB into a temporary file and return its path, runs on the I/O pool"""
         temp_file = tempfile.NamedTemporaryFile(
             delete=False,
-            prefix=request_id,
+            prefix=prefix,
             suffix=".glb",
+            buffering=DOWNLOAD_CHUNK_SIZE,
         )
-
         try:
-            response = requests.get(data_["model_mesh"]["url"], stream=True)
-            response.raise_for_status()
-            
-            for chunk in response.iter_content(chunk_size=8192):
-                temp_file.write(chunk)
-                
+            # The file is written once front to back and read back the same way by the importer
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(temp_file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            with _HTTP.get(url, stream=True, timeout=HYPER3D_DOWNLOAD_TIMEOUT) as response:
+                response.raise_for_status()
+                # Copy the raw stream in large blocks instead of a Python loop over small chunks
+                response.raw.decode_content = True
+                shutil.copyfileobj(response.raw, temp_file, DOWNLOAD_CHUNK_SIZE)
             temp_file.close()
-            
-        except Exception as e:
+        except:
             temp_file.close()
             os.unlink(temp_file.name)
-            return {"succeed": False, "error": str(e)}
+            raise
+        return temp_file.name
 
+    def _import_glb(self, filepath, name):
+        """Import a downloaded GLB and describe the resulting object, runs on the main thread"""
         try:
-            obj = self._clean_imported_glb(
-                filepath=temp_file.name,
-                mesh_name=name
-            )
+            try:
+                obj = self._clean_imported_glb(
+                    filepath=filepath,
+                    mesh_name=name
+                )
+            finally:
+                # Everything, textures included, is in the blend data now; deleting the
+                # download also lets the OS drop its cached pages right away
+                os.unlink(filepath)
             result = {
                 "name": obj.name,
                 "type": obj.type,
@@ -1775,9 +2644,11 @@ class BlenderMCPServer:
                 "scale": [obj.scale.x, obj.scale.y, obj.scale.z],
             }
 
-            if obj.type == "MESH":
-                bounding_box = self._get_aabb(obj)
-                result["world_bounding_box"] = bounding_box
+            # The cleanup always leaves a single mesh. Evaluate after it has
+            # unparented the mesh so matrix_world no longer includes the empty
+            bpy.context.view_layer.update()
+            result["world_bounding_box"] = self._get_aabb(obj)
+            self._store_aabb(obj)
             
             return {
                 "succeed": True, **result
@@ -1859,6 +2730,16 @@ class BLENDERMCP_OT_StopServer(bpy.types.Operator):
 
 # ===== REGISTRATION =====
 
+classes = (
+    BLENDERMCP_PT_Panel,
+    BLENDERMCP_OT_SetFreeTrialHyper3DAPIKey,
+    BLENDERMCP_OT_StartServer,
+    BLENDERMCP_OT_StopServer,
+)
+
+# Registers the classes in order and unregisters them in reverse
+_register_classes, _unregister_classes = bpy.utils.register_classes_factory(classes)
+
 def register():
     bpy.types.Scene.blendermcp_port = IntProperty(
         name="Port",
@@ -1902,10 +2783,7 @@ def register():
         default=""
     )
     
-    bpy.utils.register_class(BLENDERMCP_PT_Panel)
-    bpy.utils.register_class(BLENDERMCP_OT_SetFreeTrialHyper3DAPIKey)
-    bpy.utils.register_class(BLENDERMCP_OT_StartServer)
-    bpy.utils.register_class(BLENDERMCP_OT_StopServer)
+    _register_classes()
     
     print("Enhanced BlenderMCP addon registered with 40+ comprehensive tools")
 
@@ -1914,10 +2792,7 @@ def unregister():
         bpy.types.blendermcp_server.stop()
         del bpy.types.blendermcp_server
     
-    bpy.utils.unregister_class(BLENDERMCP_PT_Panel)
-    bpy.utils.unregister_class(BLENDERMCP_OT_SetFreeTrialHyper3DAPIKey)
-    bpy.utils.unregister_class(BLENDERMCP_OT_StartServer)
-    bpy.utils.unregister_class(BLENDERMCP_OT_StopServer)
+    _unregister_classes()
     
     del bpy.types.Scene.blendermcp_port
     del bpy.types.Scene.blendermcp_server_running
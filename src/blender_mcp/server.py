@@ -1,13 +1,15 @@
 # blender_mcp_server.py
 from mcp.server.fastmcp import FastMCP, Context, Image
 import socket
+import time
+import struct
 import json
 import asyncio
 import logging
 import tempfile
 from dataclasses import dataclass
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, Dict, Any, List
+from typing import AsyncIterator, Dict, Any, List, Literal
 import os
 from pathlib import Path
 import base64
@@ -22,11 +24,28 @@ logger = logging.getLogger("BlenderMCPServer")
 DEFAULT_HOST = "localhost"
 DEFAULT_PORT = 9876
 
+# Messages to and from the addon are prefixed with their length as a
+# 4-byte big-endian unsigned integer
+FRAME_HEADER = struct.Struct("!I")
+# Addons from before framing never answer a frame; how long to wait before falling back
+HANDSHAKE_TIMEOUT = 3.0
+
+# The addon's Hyper3D request timeouts and poll backoff cap. The last poll of
+# a wait can start just before the deadline, so the reply may come this much
+# later than the requested timeout
+HYPER3D_TIMEOUT = (5, 30)  # (connect, read) seconds
+HYPER3D_DOWNLOAD_TIMEOUT = (5, 60)
+RODIN_POLL_MAX_DELAY = 15.0
+RODIN_WAIT_MARGIN = sum(HYPER3D_TIMEOUT) + RODIN_POLL_MAX_DELAY
+# Fetching the download URL, downloading the GLB and importing it
+RODIN_IMPORT_MARGIN = sum(HYPER3D_TIMEOUT) + sum(HYPER3D_DOWNLOAD_TIMEOUT) + 60.0
+
 @dataclass
 class BlenderConnection:
     host: str
     port: int
     sock: socket.socket = None  # Changed from 'socket' to 'sock' to avoid naming conflict
+    framed: bool = None  # whether the addon speaks length-prefixed frames, None until negotiated
     
     def connect(self) -> bool:
         """Connect to the Blender addon socket server"""
@@ -37,6 +56,8 @@ class BlenderConnection:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.sock.connect((self.host, self.port))
             logger.info(f"Connected to Blender at {self.host}:{self.port}")
+            if self.framed is None:
+                self.framed = self._negotiate_framing()
             return True
         except Exception as e:
             logger.error(f"Failed to connect to Blender: {str(e)}")
@@ -53,63 +74,78 @@ class BlenderConnection:
             finally:
                 self.sock = None
 
-    def receive_full_response(self, sock, buffer_size=8192):
-        """Receive the complete response, potentially in multiple chunks"""
-        chunks = []
-        # Use a consistent timeout value that matches the addon's timeout
-        sock.settimeout(15.0)  # Match the addon's timeout
+    def _negotiate_framing(self) -> bool:
+        """Check that the addon answers a framed message, otherwise reconnect for bare JSON
         
+        The addon picks the mode per connection from the first byte it receives, so a
+        current addon also serves the fallback; only an old addon needs it.
+        """
+        payload = json.dumps({"type": "get_polyhaven_status", "params": {}}).encode('utf-8')
         try:
-            while True:
-                try:
-                    chunk = sock.recv(buffer_size)
-                    if not chunk:
-                        # If we get an empty chunk, the connection might be closed
-                        if not chunks:  # If we haven't received anything yet, this is an error
-                            raise Exception("Connection closed before receiving any data")
-                        break
-                    
-                    chunks.append(chunk)
-                    
-                    # Check if we've received a complete JSON object
-                    try:
-                        data = b''.join(chunks)
-                        json.loads(data.decode('utf-8'))
-                        # If we get here, it parsed successfully
-                        logger.info(f"Received complete response ({len(data)} bytes)")
-                        return data
-                    except json.JSONDecodeError:
-                        # Incomplete JSON, continue receiving
-                        continue
-                except socket.timeout:
-                    # If we hit a timeout during receiving, break the loop and try to use what we have
-                    logger.warning("Socket timeout during chunked receive")
-                    break
-                except (ConnectionError, BrokenPipeError, ConnectionResetError) as e:
-                    logger.error(f"Socket connection error during receive: {str(e)}")
-                    raise  # Re-raise to be handled by the caller
-        except socket.timeout:
-            logger.warning("Socket timeout during chunked receive")
+            self.sock.sendall(FRAME_HEADER.pack(len(payload)) + payload)
+            self._receive_frame(self.sock, HANDSHAKE_TIMEOUT)
+            return True
         except Exception as e:
-            logger.error(f"Error during receive: {str(e)}")
-            raise
-            
-        # If we get here, we either timed out or broke out of the loop
-        # Try to use what we have
-        if chunks:
+            logger.warning(f"Blender addon did not answer a framed message ({str(e)}), using unframed JSON")
+            self.sock.close()
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.connect((self.host, self.port))
+            return False
+
+    def receive_full_response(self, sock, timeout=15.0):
+        """Receive one response in the negotiated format"""
+        if self.framed is False:
+            return self._receive_json(sock, timeout)
+        return self._receive_frame(sock, timeout)
+
+    def _receive_frame(self, sock, timeout):
+        """Receive one length-prefixed response frame"""
+        # Use a consistent timeout value that matches the addon's timeout
+        sock.settimeout(timeout)  # Match the addon's timeout
+        
+        header = self._receive_exactly(sock, FRAME_HEADER.size)
+        (size,) = FRAME_HEADER.unpack(header)
+        data = self._receive_exactly(sock, size)
+        logger.info(f"Received complete response ({len(data)} bytes)")
+        return data
+
+    @staticmethod
+    def _receive_json(sock, timeout):
+        """Receive one bare JSON response, from addons without framing"""
+        sock.settimeout(timeout)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                raise Exception("Connection closed before receiving a complete response")
+            chunks.append(chunk)
+            # The response can only be complete once a closing brace arrived
+            if b'}' not in chunk:
+                continue
             data = b''.join(chunks)
-            logger.info(f"Returning data after receive completion ({len(data)} bytes)")
             try:
-                # Try to parse what we have
                 json.loads(data.decode('utf-8'))
-                return data
-            except json.JSONDecodeError:
-                # If we can't parse it, it's incomplete
-                raise Exception("Incomplete JSON response received")
-        else:
-            raise Exception("No data received")
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            logger.info(f"Received complete response ({len(data)} bytes)")
+            return data
+
+    @staticmethod
+    def _receive_exactly(sock, size):
+        """Read exactly size bytes from the socket"""
+        data = bytearray(size)
+        view = memoryview(data)
+        received = 0
+        while received < size:
+            nbytes = sock.recv_into(view[received:])
+            if not nbytes:
+                if received == 0:
+                    raise Exception("Connection closed before receiving any data")
+                raise Exception(f"Response frame truncated: connection closed after {received} of {size} bytes")
+            received += nbytes
+        return data
 
-    def send_command(self, command_type: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+    def send_command(self, command_type: str, params: Dict[str, Any] = None, timeout: float = 15.0) -> Dict[str, Any]:
         """Send a command to Blender and return the response"""
         if not self.sock and not self.connect():
             raise ConnectionError("Not connected to Blender")
@@ -123,15 +159,19 @@ class BlenderConnection:
             # Log the command being sent
             logger.info(f"Sending command: {command_type} with params: {params}")
             
-            # Send the command
-            self.sock.sendall(json.dumps(command).encode('utf-8'))
+            # Send the command as a length-prefixed frame, or bare to addons without framing
+            payload = json.dumps(command).encode('utf-8')
+            if self.framed:
+                self.sock.sendall(FRAME_HEADER.pack(len(payload)) + payload)
+            else:
+                self.sock.sendall(payload)
             logger.info(f"Command sent, waiting for response...")
             
             # Set a timeout for receiving - use the same timeout as in receive_full_response
-            self.sock.settimeout(15.0)  # Match the addon's timeout
+            self.sock.settimeout(timeout)  # Match the addon's timeout
             
             # Receive the response using the improved receive_full_response method
-            response_data = self.receive_full_response(self.sock)
+            response_data = self.receive_full_response(self.sock, timeout=timeout)
             logger.info(f"Received {len(response_data)} bytes of data")
             
             response = json.loads(response_data.decode('utf-8'))
@@ -319,6 +359,7 @@ def get_viewport_screenshot(ctx: Context, max_size: int = 800) -> Image:
 def execute_blender_code(ctx: Context, code: str) -> str:
     """
     Execute arbitrary Python code in Blender. Make sure to do it step-by-step by breaking it into smaller chunks.
+    Variables, functions and imports defined by earlier calls remain available in later ones.
     
     Parameters:
     - code: The Python code to execute
@@ -368,7 +409,8 @@ def get_polyhaven_categories(ctx: Context, asset_type: str = "hdris") -> str:
 def search_polyhaven_assets(
     ctx: Context,
     asset_type: str = "all",
-    categories: str = None
+    categories: str = None,
+    limit: int = 20
 ) -> str:
     """
     Search for assets on Polyhaven with optional filtering.
@@ -376,6 +418,7 @@ def search_polyhaven_assets(
     Parameters:
     - asset_type: Type of assets to search for (hdris, textures, models, all)
     - categories: Optional comma-separated list of categories to filter by
+    - limit: Maximum number of assets to return (default: 20)
     
     Returns a list of matching assets with basic information.
     """
@@ -383,7 +426,8 @@ def search_polyhaven_assets(
         blender = get_blender_connection()
         result = blender.send_command("search_polyhaven_assets", {
             "asset_type": asset_type,
-            "categories": categories
+            "categories": categories,
+            "limit": limit
         })
         
         if "error" in result:
@@ -468,7 +512,8 @@ def download_polyhaven_asset(
 def set_texture(
     ctx: Context,
     object_name: str,
-    texture_id: str
+    texture_id: str,
+    detail: Literal["basic", "full"] = "full"
 ) -> str:
     """
     Apply a previously downloaded Polyhaven texture to an object.
@@ -476,6 +521,8 @@ def set_texture(
     Parameters:
     - object_name: Name of the object to apply the texture to
     - texture_id: ID of the Polyhaven texture to apply (must be downloaded first)
+    - detail: "full" lists every texture node and its connections, "basic" only reports the
+      material name and node count, which is much cheaper when you only need to confirm the material
     
     Returns a message indicating success or failure.
     """
@@ -484,7 +531,8 @@ def set_texture(
         blender = get_blender_connection()
         result = blender.send_command("set_texture", {
             "object_name": object_name,
-            "texture_id": texture_id
+            "texture_id": texture_id,
+            "detail": detail
         })
         
         if "error" in result:
@@ -498,7 +546,7 @@ def set_texture(
             material_info = result.get("material_info", {})
             node_count = material_info.get("node_count", 0)
             has_nodes = material_info.get("has_nodes", False)
-            texture_nodes = material_info.get("texture_nodes", [])
+            texture_nodes = material_info.get("texture_nodes")
             
             output = f"Successfully applied texture '{texture_id}' to {object_name}.\n"
             output += f"Using material '{material_name}' with maps: {maps}.\n\n"
@@ -513,7 +561,7 @@ def set_texture(
                         output += "  Connections:\n"
                         for conn in node['connections']:
                             output += f"    {conn}\n"
-            else:
+            elif texture_nodes is not None:
                 output += "No texture nodes found in the material.\n"
             
             return output
@@ -843,6 +891,130 @@ def poll_rodin_job_status(
         logger.error(f"Error generating Hyper3D task: {str(e)}")
         return f"Error generating Hyper3D task: {str(e)}"
 
+@mcp.tool()
+def poll_rodin_jobs_batch(
+    ctx: Context,
+    keys: list[str],
+):
+    """
+    Check the status of several Hyper3D Rodin generation tasks with one call.
+
+    Parameters:
+    - keys: For Hyper3D Rodin mode MAIN_SITE the subscription_keys, for mode FAL_AI the request_ids,
+      given in the generate model steps.
+
+    Returns a mapping from each key to what poll_rodin_job_status returns for it, or to
+    {"error": ...} for a job whose status could not be fetched.
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("poll_rodin_jobs_batch", {"keys": keys})
+        return result
+    except Exception as e:
+        logger.error(f"Error generating Hyper3D task: {str(e)}")
+        return f"Error generating Hyper3D task: {str(e)}"
+
+def _wait_for_rodin_job_here(blender, poll_kwargs, timeout):
+    """Poll with the add-on's backoff (0.5s doubling up to 15s) from the MCP server process"""
+    deadline = time.monotonic() + min(timeout, 300)
+    delay = 0.5
+    while True:
+        status = blender.send_command("poll_rodin_job_status", poll_kwargs)
+        if not isinstance(status, dict):
+            return status
+        if "status_list" in status:
+            settled = all(s in ("Done", "Failed") for s in status["status_list"])
+        else:
+            settled = status.get("status") not in ("IN_QUEUE", "IN_PROGRESS")
+        remaining = deadline - time.monotonic()
+        if settled or remaining <= 0:
+            return {**status, "timed_out": not settled}
+        time.sleep(min(delay, remaining))
+        delay = min(15.0, delay * 2)
+
+@mcp.tool()
+def wait_for_rodin_job(
+    ctx: Context,
+    subscription_key: str=None,
+    request_id: str=None,
+    timeout: int=300,
+):
+    """
+    Wait until the Hyper3D Rodin generation task is finished, instead of calling poll_rodin_job_status repeatedly.
+
+    Blender polls the job itself with a backoff of 0.5s doubling up to 15s, and returns as soon as the
+    status is final or timeout (seconds, at most 300) expires. Blender stays responsive while waiting.
+
+    Parameters:
+    - subscription_key: For Hyper3D Rodin mode MAIN_SITE: The subscription_key given in the generate model step.
+    - request_id: For Hyper3D Rodin mode FAL_AI: The request_id given in the generate model step.
+    - timeout: Maximum number of seconds to wait
+
+    Returns the same status as poll_rodin_job_status, plus "timed_out" which is true if the task
+    was still running when the timeout expired.
+    """
+    try:
+        blender = get_blender_connection()
+        kwargs = {"timeout": timeout}
+        if subscription_key:
+            kwargs["subscription_key"] = subscription_key
+        elif request_id:
+            kwargs["request_id"] = request_id
+        try:
+            result = blender.send_command(
+                "wait_for_rodin_job", kwargs, timeout=min(timeout, 300) + RODIN_WAIT_MARGIN
+            )
+        except Exception as e:
+            if "Unknown command type" not in str(e):
+                raise
+            # Older add-ons can't wait themselves, poll from here instead of hot-looping the client
+            del kwargs["timeout"]
+            result = _wait_for_rodin_job_here(blender, kwargs, timeout)
+        return result
+    except Exception as e:
+        logger.error(f"Error generating Hyper3D task: {str(e)}")
+        return f"Error generating Hyper3D task: {str(e)}"
+
+@mcp.tool()
+def wait_and_import_rodin_job(
+    ctx: Context,
+    name: str,
+    subscription_key: str=None,
+    task_uuid: str=None,
+    request_id: str=None,
+    timeout: int=300,
+):
+    """
+    Wait for a Hyper3D Rodin generation task to finish and import its asset, all in one call.
+    This combines wait_for_rodin_job and import_generated_asset; Blender stays responsive meanwhile.
+
+    Parameters:
+    - name: The name of the object in scene
+    - subscription_key, task_uuid: For Hyper3D Rodin mode MAIN_SITE: both given in the generate model step.
+    - request_id: For Hyper3D Rodin mode FAL_AI: The request_id given in the generate model step.
+    - timeout: Maximum number of seconds to wait for the generation (at most 300)
+
+    Returns what import_generated_asset returns, or succeed false with the last job status if the
+    generation failed or was still running when the timeout expired.
+    """
+    try:
+        blender = get_blender_connection()
+        kwargs = {"name": name, "timeout": timeout}
+        if subscription_key and task_uuid:
+            kwargs["subscription_key"] = subscription_key
+            kwargs["task_uuid"] = task_uuid
+        elif request_id:
+            kwargs["request_id"] = request_id
+        result = blender.send_command(
+            "wait_and_import_rodin_job",
+            kwargs,
+            timeout=min(timeout, 300) + RODIN_WAIT_MARGIN + RODIN_IMPORT_MARGIN,
+        )
+        return result
+    except Exception as e:
+        logger.error(f"Error generating Hyper3D task: {str(e)}")
+        return f"Error generating Hyper3D task: {str(e)}"
+
 @mcp.tool()
 def import_generated_asset(
     ctx: Context,
@@ -870,7 +1042,8 @@ def import_generated_asset(
             kwargs["task_uuid"] = task_uuid
         elif request_id:
             kwargs["request_id"] = request_id
-        result = blender.send_command("import_generated_asset", kwargs)
+        # The GLB download can take longer than a regular command
+        result = blender.send_command("import_generated_asset", kwargs, timeout=180.0)
         return result
     except Exception as e:
         logger.error(f"Error generating Hyper3D task: {str(e)}")
@@ -915,7 +1088,9 @@ def asset_creation_strategy() -> str:
                     - Go to hyper3d.ai to find out how to get their own API key
                     - Go to fal.ai to get their own private API key
                 2. Poll the status
-                    - Use poll_rodin_job_status() to check if the generation task has completed or failed
+                    - Use wait_for_rodin_job() to wait until the generation task has completed or failed
+                    - Or use poll_rodin_job_status() to check the status once
+                    - Or use wait_and_import_rodin_job() to wait and then do step 3 in the same call
                 3. Import the asset
                     - Use import_generated_asset() to import the generated GLB model the asset
                 4. After importing the asset, ALWAYS check the world_bounding_box of the imported mesh, and adjust the mesh's location and size